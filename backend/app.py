@@ -1,10 +1,9 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from mongoengine import connect, disconnect
-from schemas.listing import Listing
 from cache_intaker import cache_intaker
+from warmup import get_readiness
+from jobs import ForecastJobQueue
 import os
-import certifi
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,14 +17,25 @@ HOST = os.getenv('HOST', '0.0.0.0')
 PORT = int(os.getenv('PORT', 8080))
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 
+jobs = ForecastJobQueue()
+
+# Preload artifacts in the background as soon as the app exists; /ready flips once they are warm
+get_readiness()
+
 @app.route('/health', methods=['GET'])
 def health_check(): 
+    """Liveness only: the process is up and serving requests."""
     return jsonify({
         'status': 'healthy',
-        'message': 'Service is running',
-        'database': 'connected'
+        'message': 'Service is running'
     })
 
+@app.route('/ready', methods=['GET'])
+def ready_check():
+    """Readiness: every warm-up component loaded (503 until then)."""
+    state = get_readiness().snapshot()
+    return jsonify(state), (200 if state['ready'] else 503)
+
 @app.route('/api/forecast', methods=['GET'])
 def get_forecast():
     try:
@@ -41,6 +51,32 @@ def get_forecast():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/forecast/jobs', methods=['POST'])
+def submit_forecast_job():
+    """Enqueue a fresh forecast; poll GET /api/forecast/jobs/<job_id> for the result."""
+    try:
+        body = request.get_json(silent=True) or request.form
+        uid = int(body.get('uid'))
+        zip_code = int(body.get('zip_code'))
+        price = int(body.get('price'))
+        score = float(body.get('score', 5))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'uid, zip_code and price must be integers, score a number'}), 400
+
+    job, deduplicated = jobs.submit(uid, zip_code, price, score)
+    return jsonify({**job, 'deduplicated': deduplicated}), 202
+
+@app.route('/api/forecast/jobs/stats', methods=['GET'])
+def forecast_job_stats():
+    return jsonify(jobs.stats())
+
+@app.route('/api/forecast/jobs/<job_id>', methods=['GET'])
+def get_forecast_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job_id {job_id}'}), 404
+    return jsonify(job)
+
 if __name__ == '__main__':
     print(f"Starting Flask application...")
     print(f"Host: {HOST}")
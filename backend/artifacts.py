@@ -0,0 +1,50 @@
+# artifacts.py
+# ---------------------------------------------------------------------------
+# File names of the input panel and trained artifacts the forecast depends on,
+# and which of them are active. Standard library only, so the forecast cache
+# and the grid surrogate can tell what is live without importing Keras or torch.
+# ---------------------------------------------------------------------------
+import hashlib
+import os
+
+# ZHVI panel the forecasts are computed from (refreshed monthly)
+CSV_PATH = "sales/Datasets_HOME_VALUE/condo.csv"
+
+# horizon (months ahead) → trained model file
+HORIZON_MODELS = {
+    10: "1-year.h5", 12: "1-year.h5", 14: "1-year.h5", 20: "1-year.h5", 24: "1-year.h5",
+    30: "3-year.h5", 36: "3-year.h5", 42: "3-year.h5",
+    45: "5-year.h5", 48: "5-year.h5", 55: "5-year.h5", 60: "5-year.h5", 65: "5-year.h5",
+}
+
+WEIGHTS_FILE = "qdelta_state_dict.pt"
+META_FILE    = "qdelta_meta.npy"          # stores min/max + SCALE
+GRID_FILE    = "qdelta_grid.npz"
+
+
+def artifact_paths(version: str | None = None) -> tuple[str, str]:
+    """
+    Weights/meta file names for a delta artifact version
+    (``None`` → the unversioned default files).
+    """
+    if not version:
+        return WEIGHTS_FILE, META_FILE
+    return f"qdelta_state_dict-{version}.pt", f"qdelta_meta-{version}.npy"
+
+
+def active_delta_version() -> str | None:
+    """Delta artifact version named by ``QDELTA_VERSION`` (unset → None)."""
+    return os.getenv("QDELTA_VERSION") or None
+
+
+def active_grid_path() -> str:
+    return os.getenv("QDELTA_GRID", GRID_FILE)
+
+
+def file_hash(path: str) -> str:
+    """Short content hash of one artifact file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
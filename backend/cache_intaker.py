@@ -1,4 +1,40 @@
-import pandas as pd
+import csv
+import os
+import threading
+
+CACHE_PATH = "forecast_results.csv"
+# published by shared_store.py; checked first so workers share one mmap copy
+STORE_CURRENT = os.path.join(os.getenv("FORECAST_STORE_DIR", "forecast_store"), "CURRENT")
+# content-addressed cache (forecast_cache.py); uid → (version, zip, score, error bucket)
+CONTENT_CACHE_DB = os.getenv("FORECAST_CACHE_DB", "forecast_cache.sqlite")
+
+# uid -> {horizon: price}; rebuilt only when the CSV changes on disk
+_index: dict[int, dict[int, float]] = {}
+_index_mtime: float | None = None
+_index_lock = threading.Lock()
+
+
+def _load_index(path: str = CACHE_PATH) -> dict[int, dict[int, float]]:
+    global _index, _index_mtime
+    mtime = os.path.getmtime(path)
+    if mtime != _index_mtime:
+        with _index_lock:
+            if mtime != _index_mtime:
+                index: dict[int, dict[int, float]] = {}
+                with open(path, newline="") as f:
+                    for row in csv.DictReader(f):
+                        index.setdefault(int(row["uid"]), {})[int(row["horizon"])] = float(row["predicted_price"])
+                _index, _index_mtime = index, mtime
+    return _index
+
+
+def _store_is_current(path: str = CACHE_PATH) -> bool:
+    """True unless the CSV was written after the store was last published."""
+    try:
+        return os.path.getmtime(STORE_CURRENT) >= os.path.getmtime(path)
+    except FileNotFoundError:
+        return os.path.exists(STORE_CURRENT)
+
 
 def cache_intaker(uid: int, zip_code: int, listing_price: int, score=5) -> dict[int, float]:
     """
@@ -21,12 +57,18 @@ def cache_intaker(uid: int, zip_code: int, listing_price: int, score=5) -> dict[
     dict[int, float]
         Keys are month offsets (e.g., −12 to 65), values are prices, sorted by horizon.
     """
-    df = pd.read_csv("forecast_results.csv")
-    df_uid = df[df["uid"] == uid]
+    by_horizon = None
+    if os.path.exists(CONTENT_CACHE_DB):
+        from forecast_cache import get_cache
+        by_horizon = get_cache().lookup_uid(uid)
+    # fresh job writes land in the CSV; don't let an older store shadow them
+    if by_horizon is None and os.path.exists(STORE_CURRENT) and _store_is_current():
+        from shared_store import get_store
+        by_horizon = get_store().forecast(uid)
+    if by_horizon is None:
+        by_horizon = _load_index().get(uid)
 
-    if df_uid.empty:
+    if not by_horizon:
         raise ValueError(f"No forecast results found for uid={uid}")
 
-    df_uid = df_uid.sort_values(by="horizon")
-    return dict(zip(df_uid["horizon"], df_uid["predicted_price"]))
-
+    return dict(sorted(by_horizon.items()))
@@ -1,30 +1,27 @@
-# quantum_delta_regressor.py
+# quantum_delta_regressor.py  (inference)
 # ---------------------------------------------------------------------------
-# Learn  g(score, error)  ➜  delta  with a 2-qubit variational regressor
-# and save everything needed for production inference.
+# Serve  g(score, error)  ➜  delta  from the trained 2-qubit variational
+# regressor.  Importing this module has no side effects: normalisation comes
+# from the saved meta file, artifacts load on first `get_predictor()` and the
+# PennyLane device is only created if the reference QNode is requested.
+# Training lives in delta_train.py.
 # ---------------------------------------------------------------------------
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 0.  Imports
 # ─────────────────────────────────────────────────────────────────────────────
+import threading
+
 import numpy as np
-import pandas as pd
-import pennylane as qml
 import torch
+from artifacts import (META_FILE, WEIGHTS_FILE, active_delta_version,
+                       artifact_paths, file_hash)
 from torch import nn
-from torch.utils.data import DataLoader, TensorDataset
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 1.  Load CSV and prepare tensors
+# 1.  Constants + input encoding
 # ─────────────────────────────────────────────────────────────────────────────
-CSV_PATH = "sales/Datasets_HOME_VALUE/delta_training_data.csv"      # ◀─ put your file here
-SCALE    = 1e4                            # Δ is learned in “tens-of-thousands”
-
-df = pd.read_csv(CSV_PATH, usecols=["score", "error", "delta"]).dropna()
-assert {"score", "error", "delta"} <= set(df.columns)
-
-s_min, s_max = df["score"].min(),  df["score"].max()
-e_min, e_max = df["error"].min(),  df["error"].max()
+SCALE        = 1e4                        # Δ is learned in “tens-of-thousands”
 
 def _angle(v, lo, hi):
     """
@@ -34,44 +31,74 @@ def _angle(v, lo, hi):
     v = v.astype("float32")
     return 2 * np.pi * (v - lo) / (hi - lo + 1e-12) - np.pi
 
-X = np.stack(
-        [
-            _angle(df["score"].values, s_min, s_max),
-            _angle(df["error"].values, e_min, e_max)
-        ],
-        axis=1,                              # shape (N, 2)
-    ).astype("float32")
-
-# ❶ RESCALE:  teach the network Δ/10 000  → output is O(±2.5)
-y = (df["delta"].values.astype("float32") / SCALE)[:, None]       # (N,1)
-
-loader = DataLoader(
-    TensorDataset(torch.tensor(X), torch.tensor(y)),
-    batch_size=32,
-    shuffle=True,
-)
-
 # ─────────────────────────────────────────────────────────────────────────────
 # 2.  Quantum circuit + PyTorch wrapper
 # ─────────────────────────────────────────────────────────────────────────────
 N_QUBITS = 2
-dev = qml.device("lightning.qubit", wires=N_QUBITS)
-
-def feature_map(x):
-    qml.RY(x[0], wires=0)
-    qml.RY(x[1], wires=1)
-    qml.CNOT(wires=[0, 1])
-
-def ansatz(weights):
-    for i in range(N_QUBITS):
-        qml.Rot(*weights[i], wires=i)
-    qml.CNOT(wires=[0, 1])
+_circuit = None
 
-@qml.qnode(dev, interface="torch")
-def circuit(x, weights):
-    feature_map(x)
-    ansatz(weights)
-    return [qml.expval(qml.PauliZ(i)) for i in range(N_QUBITS)]
+def get_circuit():
+    """
+    Reference PennyLane QNode for the circuit `batched_circuit` simulates;
+    the device is built on first use.
+    """
+    global _circuit
+    if _circuit is None:
+        import pennylane as qml
+
+        dev = qml.device("lightning.qubit", wires=N_QUBITS)
+
+        def feature_map(x):
+            qml.RY(x[0], wires=0)
+            qml.RY(x[1], wires=1)
+            qml.CNOT(wires=[0, 1])
+
+        def ansatz(weights):
+            for i in range(N_QUBITS):
+                qml.Rot(*weights[i], wires=i)
+            qml.CNOT(wires=[0, 1])
+
+        @qml.qnode(dev, interface="torch")
+        def circuit(x, weights):
+            feature_map(x)
+            ansatz(weights)
+            return [qml.expval(qml.PauliZ(i)) for i in range(N_QUBITS)]
+
+        _circuit = circuit
+    return _circuit
+
+# Same circuit as `get_circuit()`, simulated analytically for a whole batch.
+# State is a (batch, 2, 2) tensor indexed [wire 0, wire 1]; expectation
+# values are exact, so autograd gives the same gradients as the QNode
+# (checked by delta_parity.py).
+def _rot(w):
+    """qml.Rot(φ, θ, ω) = RZ(ω) RY(θ) RZ(φ) as a 2×2 complex matrix."""
+    phi, theta, omega = w[0], w[1], w[2]
+    c, s = torch.cos(theta / 2), torch.sin(theta / 2)
+    def phase(a):
+        return torch.complex(torch.cos(a), torch.sin(a))
+    return torch.stack([
+        torch.stack([phase(-(phi + omega) / 2) * c, -phase((phi - omega) / 2) * s]),
+        torch.stack([phase(-(phi - omega) / 2) * s,  phase((phi + omega) / 2) * c]),
+    ])
+
+def _cnot(psi):
+    # flip wire 1 where wire 0 is |1>
+    return torch.stack([psi[:, 0], psi[:, 1].flip(-1)], dim=1)
+
+def batched_circuit(x, weights):
+    """Return ⟨Z0⟩, ⟨Z1⟩ for every row of x: (batch, 2) → (batch, 2)."""
+    c, s = torch.cos(x / 2), torch.sin(x / 2)
+    # feature_map: RY(x0) ⊗ RY(x1) |00>, then CNOT
+    psi = torch.stack([c[:, 0], s[:, 0]], -1)[:, :, None] * torch.stack([c[:, 1], s[:, 1]], -1)[:, None, :]
+    psi = _cnot(psi).to(torch.complex64)
+    # ansatz: Rot on each wire, then CNOT
+    psi = torch.einsum("ij,bjk,lk->bil", _rot(weights[0]), psi, _rot(weights[1]))
+    psi = _cnot(psi)
+    p = psi.real ** 2 + psi.imag ** 2
+    z0 = p[:, 0].sum(-1) - p[:, 1].sum(-1)
+    z1 = p[:, :, 0].sum(-1) - p[:, :, 1].sum(-1)
+    return torch.stack([z0, z1], dim=-1)
 
 class VariationalRegressor(nn.Module):
     """
@@ -84,94 +111,67 @@ class VariationalRegressor(nn.Module):
         self.fc    = nn.Linear(N_QUBITS, 1, bias=True)
 
     def forward(self, x):                     # x: (batch, 2)
-        out = [torch.stack(circuit(row, self.theta)) for row in x]
-        out = torch.stack(out)                # (batch, 2)
+        out = batched_circuit(x, self.theta)  # (batch, 2)
         return self.fc(out)                   # (batch, 1)
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 3.  Train
-# ─────────────────────────────────────────────────────────────────────────────
-model   = VariationalRegressor()
-optim   = torch.optim.Adam(model.parameters(), lr=1e-2)
-loss_fn = nn.MSELoss()
-#
-# EPOCHS = 200
-# for epoch in range(1, EPOCHS + 1):
-#     for xb, yb in loader:
-#         pred = model(xb)
-#         loss = loss_fn(pred, yb)
-#         loss.backward()
-#         optim.step()
-#         optim.zero_grad()
-#     if epoch == 1 or epoch % 20 == 0:
-#         print(f"epoch {epoch:3d}   train-MSE: {loss.item():,.4f}")
-
+# 3.  Load-once predictor
 # ─────────────────────────────────────────────────────────────────────────────
-# 4.  Convenience wrappers
-# ─────────────────────────────────────────────────────────────────────────────
-def predict_delta(score: float, error: float) -> float:
+class DeltaPredictor:
     """
-    Return Δ **in dollars** (remember to re-multiply by SCALE).
+    Inference-only delta model: artifacts are read and the regressor is
+    built once, then `predict` / `predict_many` are pure functions.
     """
-    x_scaled = np.array(
-        [
-            _angle(np.array([score]), s_min, s_max)[0],
-            _angle(np.array([error]), e_min, e_max)[0],
-        ],
-        dtype="float32",
-    )
-    x_tensor = torch.tensor(x_scaled).unsqueeze(0)  # (1,2)
-    with torch.no_grad():
-        return float(model(x_tensor).squeeze()) * SCALE
+    def __init__(self, weights_path: str = WEIGHTS_FILE, meta_path: str = META_FILE,
+                 version: str | None = None):
+        self.s_min, self.s_max, self.e_min, self.e_max, self.scale = np.load(meta_path)
+        self.reg = VariationalRegressor()
+        self.reg.load_state_dict(torch.load(weights_path, map_location="cpu"))
+        self.reg.eval()
+        if version is None:
+            # content hash, so callers can key caches on the exact weights
+            version = file_hash(weights_path)
+        self.version = version
+
+    def predict_many(self, scores, errors) -> np.ndarray:
+        """Vectorised Δ in dollars for equal-length score/error arrays."""
+        x = np.stack(
+            [
+                _angle(np.asarray(scores, dtype="float32").ravel(), self.s_min, self.s_max),
+                _angle(np.asarray(errors, dtype="float32").ravel(), self.e_min, self.e_max),
+            ],
+            axis=1,
+        ).astype("float32")
+        with torch.no_grad():
+            return self.reg(torch.from_numpy(x)).squeeze(-1).numpy().astype(float) * self.scale
 
-# ─────────────────────────────────────────────────────────────────────────────
-# 5.  Persist weights + meta so production can reload identically
-# ─────────────────────────────────────────────────────────────────────────────
-WEIGHTS_FILE = "qdelta_state_dict.pt"
-META_FILE    = "qdelta_meta.npy"          # stores min/max + SCALE
+    def predict(self, score: float, error: float) -> float:
+        return float(self.predict_many([score], [error])[0])
 
-def save_qdelta(
-    weights_path: str = WEIGHTS_FILE,
-    meta_path: str = META_FILE,
-):
-    torch.save(model.state_dict(), weights_path)
-    np.save(meta_path, np.array([s_min, s_max, e_min, e_max, SCALE]))
+_predictor: DeltaPredictor | None = None
+_predictor_lock = threading.Lock()
+
+def get_predictor() -> DeltaPredictor:
+    """
+    Process-wide predictor, loaded on first use from the artifact version
+    named by ``QDELTA_VERSION`` (unset → default files).
+    """
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                version = active_delta_version()
+                _predictor = DeltaPredictor(*artifact_paths(version), version=version)
+    return _predictor
 
 def load_qdelta(
     weights_path: str = WEIGHTS_FILE,
     meta_path: str = META_FILE,
 ):
-    s_min_, s_max_, e_min_, e_max_, scale_ = np.load(meta_path)
-    reg = VariationalRegressor()
-    reg.load_state_dict(torch.load(weights_path, map_location="cpu"))
-    reg.eval()
-
-    def _predict(score, error):
-        x_scaled = np.array(
-            [
-                _angle(np.array([score]), s_min_, s_max_)[0],
-                _angle(np.array([error]), e_min_, e_max_)[0],
-            ],
-            dtype="float32",
-        )
-        with torch.no_grad():
-            return float(reg(torch.tensor(x_scaled).unsqueeze(0)).squeeze()) * scale_
-
-    return _predict
+    return DeltaPredictor(weights_path, meta_path).predict
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 6.  Demo – run only when executed directly
+# 4.  Serving entry point
 # ─────────────────────────────────────────────────────────────────────────────
-def get_delta(s_ex,e_ex):
-    # quick example before saving
-    print("\nBefore saving:")
-    print(f"score={s_ex}, error={e_ex:+,.0f} → delta ≈ {predict_delta(s_ex, e_ex):+,.0f}")
-
-    # persist
-    save_qdelta()
-
-    # fresh reload & re-test
-    g = load_qdelta()
-    print("After reload:")
-    print(f"score={s_ex}, error={e_ex:+,.0f} → delta ≈ {g(s_ex, e_ex):+,.0f}")
-    return g(s_ex, e_ex)
+def get_delta(s_ex, e_ex):
+    return get_predictor().predict(s_ex, e_ex)
@@ -0,0 +1,63 @@
+# delta_parity.py
+# ---------------------------------------------------------------------------
+# Check that `batched_circuit` (the batched torch simulation in delta.py)
+# matches the PennyLane QNode it replaces: expectation values, and the
+# autograd gradients w.r.t. inputs and weights, on random inputs.
+#
+#   python delta_parity.py                     # 64 rows, atol 1e-4
+#   python delta_parity.py --n 256 --atol 1e-5
+#
+# Exits non-zero when any difference exceeds the tolerance.
+# ---------------------------------------------------------------------------
+import argparse
+import sys
+
+import torch
+
+from delta import N_QUBITS, batched_circuit, get_circuit
+
+
+def _values_and_grads(fn, x, w, v):
+    """fn(x, w) → (batch, 2); gradients are those of Σ v·fn(x, w)."""
+    x = x.clone().requires_grad_(True)
+    w = w.clone().requires_grad_(True)
+    out = fn(x, w)
+    (out * v).sum().backward()
+    return out.detach(), x.grad, w.grad
+
+
+def _qnode_rows(x, w):
+    circuit = get_circuit()
+    return torch.stack([torch.stack(list(circuit(row, w))) for row in x])
+
+
+def check_parity(n: int = 64, atol: float = 1e-4, seed: int = 0) -> dict:
+    """Max |difference| between batched_circuit and the QNode per quantity."""
+    g = torch.Generator().manual_seed(seed)
+    x = (2 * torch.rand(n, 2, generator=g) - 1) * torch.pi        # encoded angles
+    w = (2 * torch.rand(N_QUBITS, 3, generator=g) - 1) * torch.pi
+    v = torch.randn(n, 2, generator=g)                            # random cotangent
+
+    ours = _values_and_grads(batched_circuit, x, w, v)
+    ref = _values_and_grads(_qnode_rows, x.double(), w.double(), v.double())
+
+    diffs = {
+        name: float((a.double() - b.double()).abs().max())
+        for name, a, b in zip(("values", "grad_x", "grad_weights"), ours, ref)
+    }
+    diffs["ok"] = all(d <= atol for d in diffs.values())
+    return diffs
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="batched_circuit vs PennyLane QNode parity")
+    p.add_argument("--n", type=int, default=64)
+    p.add_argument("--atol", type=float, default=1e-4)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    result = check_parity(args.n, args.atol, args.seed)
+    for name in ("values", "grad_x", "grad_weights"):
+        print(f"{name:<13} max |diff| = {result[name]:.2e}")
+    print("OK" if result["ok"] else f"FAIL (atol {args.atol:g})")
+    sys.exit(0 if result["ok"] else 1)
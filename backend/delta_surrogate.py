@@ -0,0 +1,158 @@
+# delta_surrogate.py
+# ---------------------------------------------------------------------------
+# NumPy-only stand-in for the quantum delta regressor.
+#
+# The regressor has two bounded scalar inputs (score, error), so we evaluate
+# it once on a dense grid and serve bilinear interpolation from that grid.
+# Serving then needs neither torch nor PennyLane.
+#
+#   python delta_surrogate.py            # export qdelta_grid.npz
+#
+# Error bound: export_grid() compares the surrogate with the real circuit at
+# every grid-cell centre (where bilinear error peaks) plus random interior
+# points, and stores the max/p99 absolute error (in dollars) in the file;
+# DeltaGridSurrogate.max_abs_error exposes it. The bound holds inside the
+# training range only – inputs outside it are clamped to the edge.
+#
+# The grid records the version and weights hash of the regressor it was
+# sampled from; get_surrogate() ignores a grid that does not match the
+# active delta artifacts (retrained, or another QDELTA_VERSION), so the
+# exact regressor is used until the grid is re-exported.
+# ---------------------------------------------------------------------------
+import logging
+import os
+import threading
+
+import numpy as np
+from artifacts import GRID_FILE, active_delta_version, active_grid_path, artifact_paths, file_hash
+
+
+class DeltaGridSurrogate:
+    """
+    Bilinear interpolation over a precomputed (score, error) → Δ grid.
+    """
+    def __init__(self, scores: np.ndarray, errors: np.ndarray, values: np.ndarray,
+                 version: str = "", max_abs_error: float = float("nan"), weights_hash: str = ""):
+        self.scores = np.asarray(scores, dtype=float)
+        self.errors = np.asarray(errors, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.version = version
+        self.weights_hash = weights_hash
+        self.max_abs_error = max_abs_error
+
+        # uniform axes → O(1) cell lookup
+        self._s0, self._e0 = float(self.scores[0]), float(self.errors[0])
+        self._ds = float(self.scores[1] - self.scores[0])
+        self._de = float(self.errors[1] - self.errors[0])
+        self._ns, self._ne = len(self.scores), len(self.errors)
+        self._rows = self.values.tolist()            # fast scalar indexing
+
+    @classmethod
+    def load(cls, path: str = GRID_FILE) -> "DeltaGridSurrogate":
+        with np.load(path) as g:
+            return cls(g["scores"], g["errors"], g["values"],
+                       version=str(g["version"]), max_abs_error=float(g["max_abs_error"]),
+                       weights_hash=str(g["weights_hash"]) if "weights_hash" in g.files else "")
+
+    def predict_many(self, scores, errors) -> np.ndarray:
+        fs = (np.clip(np.asarray(scores, dtype=float), self.scores[0], self.scores[-1]) - self._s0) / self._ds
+        fe = (np.clip(np.asarray(errors, dtype=float), self.errors[0], self.errors[-1]) - self._e0) / self._de
+        i = np.minimum(fs.astype(int), self._ns - 2)
+        j = np.minimum(fe.astype(int), self._ne - 2)
+        ts, te = fs - i, fe - j
+        v = self.values
+        return ((1 - ts) * (1 - te) * v[i, j] + ts * (1 - te) * v[i + 1, j]
+                + (1 - ts) * te * v[i, j + 1] + ts * te * v[i + 1, j + 1])
+
+    def predict(self, score: float, error: float) -> float:
+        # scalar path in plain Python – avoids per-call NumPy overhead
+        fs = (min(max(float(score), self._s0), float(self.scores[-1])) - self._s0) / self._ds
+        fe = (min(max(float(error), self._e0), float(self.errors[-1])) - self._e0) / self._de
+        i = min(int(fs), self._ns - 2)
+        j = min(int(fe), self._ne - 2)
+        ts, te = fs - i, fe - j
+        r0, r1 = self._rows[i], self._rows[i + 1]
+        return ((1 - ts) * (1 - te) * r0[j] + ts * (1 - te) * r1[j]
+                + (1 - ts) * te * r0[j + 1] + ts * te * r1[j + 1])
+
+
+def export_grid(path: str = GRID_FILE, n_score: int = 201, n_error: int = 2001,
+                n_check: int = 100_000, seed: int = 0) -> DeltaGridSurrogate:
+    """
+    Evaluate the trained regressor on an n_score × n_error grid, measure the
+    surrogate error against the real circuit and save everything to `path`.
+    """
+    from delta import get_predictor      # torch only needed here
+
+    pred = get_predictor()
+    weights_hash = file_hash(artifact_paths(active_delta_version())[0])
+    scores = np.linspace(pred.s_min, pred.s_max, n_score)
+    errors = np.linspace(pred.e_min, pred.e_max, n_error)
+    S, E = np.meshgrid(scores, errors, indexing="ij")
+    values = pred.predict_many(S.ravel(), E.ravel()).reshape(n_score, n_error)
+    sur = DeltaGridSurrogate(scores, errors, values, version=pred.version, weights_hash=weights_hash)
+
+    # cell centres + uniform random points
+    cs = (scores[:-1] + scores[1:]) / 2
+    ce = (errors[:-1] + errors[1:]) / 2
+    CS, CE = np.meshgrid(cs, ce, indexing="ij")
+    rng = np.random.default_rng(seed)
+    chk_s = np.concatenate([CS.ravel(), rng.uniform(scores[0], scores[-1], n_check)])
+    chk_e = np.concatenate([CE.ravel(), rng.uniform(errors[0], errors[-1], n_check)])
+    abs_err = np.abs(sur.predict_many(chk_s, chk_e) - pred.predict_many(chk_s, chk_e))
+    sur.max_abs_error = float(abs_err.max())
+
+    np.savez(path, scores=scores, errors=errors, values=values,
+             version=np.array(pred.version), weights_hash=np.array(weights_hash), max_abs_error=sur.max_abs_error,
+             p99_abs_error=float(np.percentile(abs_err, 99)))
+    print(f"Saved {n_score}×{n_error} delta grid to {path} "
+          f"(max |err| ${sur.max_abs_error:,.2f}, p99 ${np.percentile(abs_err, 99):,.2f})")
+    return sur
+
+
+def matches_active_delta(sur: DeltaGridSurrogate) -> bool:
+    """
+    True if `sur` was sampled from the delta artifacts ``QDELTA_VERSION``
+    selects now. Grids exported before the weights hash was stored are
+    checked on the version alone.
+    """
+    version = active_delta_version()
+    weights_path = artifact_paths(version)[0]
+    if not os.path.exists(weights_path):
+        return True                      # nothing to compare against
+    weights_hash = file_hash(weights_path)
+    if sur.weights_hash:
+        return sur.weights_hash == weights_hash and sur.version == (version or weights_hash)
+    return sur.version == (version or weights_hash)
+
+
+_surrogate = None
+_surrogate_loaded = False
+_surrogate_lock = threading.Lock()
+
+
+def get_surrogate():
+    """
+    Process-wide surrogate from ``QDELTA_GRID`` (default qdelta_grid.npz),
+    or None when no grid has been exported or it is stale.
+    """
+    global _surrogate, _surrogate_loaded
+    if not _surrogate_loaded:
+        path = active_grid_path()
+        if not os.path.exists(path):
+            return None
+        with _surrogate_lock:
+            if not _surrogate_loaded:
+                sur = DeltaGridSurrogate.load(path)
+                if matches_active_delta(sur):
+                    _surrogate = sur
+                else:
+                    logging.warning("Delta grid %s (version %s) does not match the active delta "
+                                    "artifacts; using the exact regressor until it is re-exported.",
+                                    path, sur.version)
+                _surrogate_loaded = True
+    return _surrogate
+
+
+if __name__ == "__main__":
+    export_grid()
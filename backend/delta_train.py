@@ -0,0 +1,98 @@
+# quantum_delta_regressor.py  (training)
+# ---------------------------------------------------------------------------
+# Learn  g(score, error)  ➜  delta  with a 2-qubit variational regressor
+# and save everything needed for production inference (see delta.py).
+#
+#   python delta_train.py
+# ---------------------------------------------------------------------------
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 0.  Imports
+# ─────────────────────────────────────────────────────────────────────────────
+import numpy as np
+import pandas as pd
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from delta import META_FILE, SCALE, WEIGHTS_FILE, VariationalRegressor, _angle
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1.  Load CSV and prepare tensors
+# ─────────────────────────────────────────────────────────────────────────────
+CSV_PATH = "sales/Datasets_HOME_VALUE/delta_training_data.csv"      # ◀─ put your file here
+
+df = pd.read_csv(CSV_PATH, usecols=["score", "error", "delta"]).dropna()
+assert {"score", "error", "delta"} <= set(df.columns)
+
+s_min, s_max = df["score"].min(),  df["score"].max()
+e_min, e_max = df["error"].min(),  df["error"].max()
+
+X = np.stack(
+        [
+            _angle(df["score"].values, s_min, s_max),
+            _angle(df["error"].values, e_min, e_max)
+        ],
+        axis=1,                              # shape (N, 2)
+    ).astype("float32")
+
+# ❶ RESCALE:  teach the network Δ/10 000  → output is O(±2.5)
+y = (df["delta"].values.astype("float32") / SCALE)[:, None]       # (N,1)
+
+loader = DataLoader(
+    TensorDataset(torch.tensor(X), torch.tensor(y)),
+    batch_size=32,
+    shuffle=True,
+)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2.  Train
+# ─────────────────────────────────────────────────────────────────────────────
+model   = VariationalRegressor()
+optim   = torch.optim.Adam(model.parameters(), lr=1e-2)
+loss_fn = nn.MSELoss()
+
+def train(epochs: int = 200):
+    for epoch in range(1, epochs + 1):
+        for xb, yb in loader:
+            pred = model(xb)
+            loss = loss_fn(pred, yb)
+            loss.backward()
+            optim.step()
+            optim.zero_grad()
+        if epoch == 1 or epoch % 20 == 0:
+            print(f"epoch {epoch:3d}   train-MSE: {loss.item():,.4f}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3.  Convenience wrappers
+# ─────────────────────────────────────────────────────────────────────────────
+def predict_delta(score: float, error: float) -> float:
+    """
+    Return Δ **in dollars** (remember to re-multiply by SCALE).
+    """
+    x_scaled = np.array(
+        [
+            _angle(np.array([score]), s_min, s_max)[0],
+            _angle(np.array([error]), e_min, e_max)[0],
+        ],
+        dtype="float32",
+    )
+    x_tensor = torch.tensor(x_scaled).unsqueeze(0)  # (1,2)
+    with torch.no_grad():
+        return float(model(x_tensor).squeeze()) * SCALE
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4.  Persist weights + meta so production can reload identically
+# ─────────────────────────────────────────────────────────────────────────────
+def save_qdelta(
+    weights_path: str = WEIGHTS_FILE,
+    meta_path: str = META_FILE,
+):
+    torch.save(model.state_dict(), weights_path)
+    np.save(meta_path, np.array([s_min, s_max, e_min, e_max, SCALE]))
+
+
+if __name__ == "__main__":
+    train()
+    save_qdelta()
+    print(f"Saved {WEIGHTS_FILE} and {META_FILE}")
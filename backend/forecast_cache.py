@@ -0,0 +1,232 @@
+"""
+Content-addressed forecast cache.
+
+`input_handler` only depends on (zip_code, score, listing_price), the last
+through ``error = latest_fv − listing_price``. Forecasts are therefore
+cached under
+
+    (model version, zip_code, score, quantized error)
+
+with the error bucketed to ``FORECAST_ERROR_BUCKET`` dollars (default
+5,000). Listings in the same ZIP with a similar price and score share one
+entry. Each uid only stores a pointer to its key.
+
+Tiers: an in-process LRU (``FORECAST_CACHE_SIZE`` entries) in front of a
+SQLite file (``FORECAST_CACHE_DB``) shared by every worker and run.
+
+    python forecast_cache.py ../public/data.json     # precompute listings
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from artifacts import CSV_PATH, HORIZON_MODELS, active_delta_version, active_grid_path, artifact_paths
+
+CACHE_DB = os.getenv("FORECAST_CACHE_DB", "forecast_cache.sqlite")
+ERROR_BUCKET = float(os.getenv("FORECAST_ERROR_BUCKET", 5_000))
+LRU_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 4_096))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    key        TEXT PRIMARY KEY,
+    version    TEXT NOT NULL,
+    zip_code   INTEGER NOT NULL,
+    score      REAL NOT NULL,
+    bucket     INTEGER NOT NULL,
+    payload    TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uid_keys (
+    uid INTEGER PRIMARY KEY,
+    key TEXT NOT NULL
+);
+"""
+
+_version = None
+
+
+def versioned_files() -> list[str]:
+    """Every file whose change invalidates cached curves: the ZHVI input
+    panel, the horizon models and the delta weights/meta/grid selected by
+    the environment."""
+    return [CSV_PATH, *dict.fromkeys(HORIZON_MODELS.values()),
+            *artifact_paths(active_delta_version()), active_grid_path()]
+
+
+def _stamp(names: list[str]) -> tuple:
+    stamp = []
+    for name in names:
+        try:
+            st = os.stat(name)
+        except FileNotFoundError:
+            continue
+        stamp.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def model_version() -> str:
+    """Short hash of the active input data and model/delta artifacts.
+
+    Rehashed only when one of the files' mtime or size changes, so a data
+    refresh or retrain is picked up by running workers too."""
+    global _version
+    names = versioned_files()
+    stamp = _stamp(names)
+    if _version is None or _version[0] != stamp:
+        h = hashlib.sha256()
+        for name, _, _ in stamp:
+            h.update(name.encode())
+            with open(name, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        _version = (stamp, h.hexdigest()[:12])
+    return _version[1]
+
+
+def make_key(zip_code: int, score: float, error: float, version: str | None = None) -> tuple[str, int]:
+    """Return (key, error bucket) for a forecast request."""
+    bucket = int(round(error / ERROR_BUCKET))
+    key = f"{version or model_version()}:{int(zip_code)}:{round(float(score), 1)}:{bucket}"
+    return key, bucket
+
+
+class ForecastCache:
+    """LRU memory tier over a persistent SQLite tier."""
+
+    def __init__(self, path: str = CACHE_DB, lru_size: int = LRU_SIZE):
+        self.path = path
+        self.lru_size = lru_size
+        self._lru: OrderedDict[str, dict[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; WAL lets worker processes read concurrently
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------------------------------------------------------------- tiers
+    def _lru_get(self, key: str):
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+            return value
+
+    def _lru_put(self, key: str, value: dict[int, float]):
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def get(self, key: str) -> dict[int, float] | None:
+        value = self._lru_get(key)
+        if value is not None:
+            return value
+        row = self._conn().execute("SELECT payload FROM forecasts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value = {int(h): p for h, p in json.loads(row[0]).items()}
+        self._lru_put(key, value)
+        return value
+
+    def put(self, key: str, bucket: int, zip_code: int, score: float, value: dict[int, float]):
+        version = key.split(":", 1)[0]
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, version, int(zip_code), float(score), bucket,
+                 json.dumps({int(h): float(p) for h, p in value.items()}), time.time()),
+            )
+        self._lru_put(key, value)
+
+    # ------------------------------------------------------------------ uid
+    def map_uid(self, uid: int, key: str):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO uid_keys VALUES (?, ?)", (int(uid), key))
+
+    def lookup_uid(self, uid: int) -> dict[int, float] | None:
+        """Curve the uid points to, unless it was computed by older artifacts."""
+        row = self._conn().execute("SELECT key FROM uid_keys WHERE uid = ?", (int(uid),)).fetchone()
+        if row is None or not row[0].startswith(model_version() + ":"):
+            return None
+        return self.get(row[0])
+
+    # -------------------------------------------------------------- compute
+    def resolve(self, zip_code: int, listing_price: float, score=5,
+                uid: int | None = None) -> tuple[str, dict[int, float]]:
+        """
+        Return (key, cached `input_handler` result). A miss computes the curve
+        once for the bucket's representative price (error at the bucket centre).
+        """
+        from model import input_handler, latest_fv
+
+        fv_latest = latest_fv(zip_code)
+        key, bucket = make_key(zip_code, score, fv_latest - listing_price)
+
+        value = self.get(key)
+        if value is None:
+            rep_price = fv_latest - bucket * ERROR_BUCKET
+            results = input_handler(uid if uid is not None else -1, zip_code, rep_price, score)
+            value = {int(h): float(p) for h, p in results.items()}
+            self.put(key, bucket, zip_code, score, value)
+        if uid is not None:
+            self.map_uid(uid, key)
+        return key, value
+
+    def get_or_compute(self, zip_code: int, listing_price: float, score=5,
+                       uid: int | None = None) -> dict[int, float]:
+        return self.resolve(zip_code, listing_price, score, uid)[1]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ForecastCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ForecastCache()
+    return _cache
+
+
+def precompute(listings) -> dict:
+    """
+    Fill the cache for an iterable of (uid, zip_code, listing_price, score);
+    each distinct key is computed once.
+    """
+    cache = get_cache()
+    keys, n = set(), 0
+    for uid, zip_code, price, score in listings:
+        keys.add(cache.resolve(zip_code, price, score, uid=uid)[0])
+        n += 1
+    return {"listings": n, "unique_keys": len(keys)}
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "../public/data.json"
+    with open(path, encoding="utf-8") as f:
+        props = json.load(f)
+    rows = [
+        (p.get("index", i), int(p["zipcode"]),
+         float(p["price"].replace("$", "").replace(",", "")), float(p.get("score") or 5))
+        for i, p in enumerate(props)
+        if p.get("zipcode") and any(ch.isdigit() for ch in p.get("price", ""))
+    ]
+    stats = precompute(rows)
+    print(f"✓ {stats['listings']} listings → {stats['unique_keys']} forecasts computed/cached in {CACHE_DB}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+import_budget.py
+––––––––––––––––
+Import-time budget check for the backend entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter,
+prints the most expensive modules (cumulative µs) and fails when the total
+exceeds the budget or a heavy dependency sneaks onto the cold-start path.
+
+    python import_budget.py                 # checks `app`, 500 ms budget
+    python import_budget.py model --budget-ms 2000 --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# must never be imported just to serve cached forecasts
+HEAVY = ("tensorflow", "keras", "torch", "pennylane", "scipy", "sklearn", "pandas", "mongoengine")
+
+
+def measure(module: str) -> list[tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) rows from -X importtime.
+
+    ``depth`` is the nesting level (0 = imported directly by the ``-c``
+    statement), read from the name's indentation before it is stripped.
+    """
+    # app.py starts warm-up on import; keep its background loads out of the measurement
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "WARMUP_COMPONENTS": ""},
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, raw_name = line[len("import time:"):].split("|")
+        # one space after the bar, then two more per nesting level
+        depth = (len(raw_name) - len(raw_name.lstrip(" ")) - 1) // 2
+        rows.append((raw_name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser(description="Import-time budget check")
+    p.add_argument("module", nargs="?", default="app", help="module to import (default: app)")
+    p.add_argument("--budget-ms", type=float, default=500, help="max total import time (default: 500)")
+    p.add_argument("--top", type=int, default=15, help="how many modules to list (default: 15)")
+    p.add_argument("--allow-heavy", action="store_true", help="don't fail on heavy dependencies")
+    args = p.parse_args()
+
+    rows = measure(args.module)
+    top_level = {name: cum for name, _, cum, depth in rows if depth == 0}
+    total_ms = top_level.get(args.module, sum(top_level.values())) / 1000
+
+    print(f"📦 import {args.module}: {total_ms:,.1f} ms (budget {args.budget_ms:,.0f} ms)")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"   {cum_us / 1000:9.1f} ms cum  {self_us / 1000:8.1f} ms self  {name}")
+
+    loaded_heavy = sorted({n.split(".")[0] for n, *_ in rows} & set(HEAVY))
+    failed = False
+    if loaded_heavy and not args.allow_heavy:
+        print(f"❌ Heavy modules imported: {', '.join(loaded_heavy)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ Over budget by {total_ms - args.budget_ms:,.1f} ms")
+        failed = True
+    if not failed:
+        print("✓ Within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+In-process job queue for on-demand forecasts.
+
+`input_handler` takes many seconds, so the API only enqueues work and hands
+back a job id; a small thread pool (``FORECAST_WORKERS``, default 1) runs
+the forecasts through the content-addressed cache (forecast_cache.py) and
+saves them to forecast_results.csv, where the cache path picks them up.
+Identical inputs share one job while it is queued, running or done, as
+long as the model/data version (forecast_cache.model_version) is unchanged.
+"""
+import collections
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_FINISHED = 10_000      # finished jobs kept for polling / dedup
+
+_save_lock = threading.Lock()
+
+
+def _run_forecast(uid: int, zip_code: int, price: int, score: float) -> dict:
+    from forecast_cache import get_cache
+    from model import save_forecast_to_csv
+
+    results = get_cache().get_or_compute(zip_code, price, score, uid=uid)
+    with _save_lock:
+        save_forecast_to_csv(uid, zip_code, results)
+    return results
+
+
+def _model_version() -> str:
+    from forecast_cache import model_version
+    return model_version()
+
+
+class ForecastJobQueue:
+    """Deduplicating job queue with status polling and latency stats."""
+
+    def __init__(self, workers: int | None = None, runner=_run_forecast, versioner=_model_version):
+        self._runner = runner
+        self._versioner = versioner
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or int(os.getenv("FORECAST_WORKERS", 1)),
+            thread_name_prefix="forecast-job",
+        )
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+        self._by_key: dict[tuple, str] = {}
+        self._finished = collections.deque()
+        self._latency = collections.deque(maxlen=1000)   # (wait_s, run_s)
+
+    def submit(self, uid: int, zip_code: int, price: int, score: float) -> tuple[dict, bool]:
+        """Enqueue a forecast; returns (job, deduplicated)."""
+        key = (uid, zip_code, price, score)
+        # a finished job only stands in for one computed by the same models and data
+        dedup_key = (self._versioner(), *key)
+        with self._lock:
+            job_id = self._by_key.get(dedup_key)
+            if job_id is not None and self._jobs[job_id]["status"] != "failed":
+                return self._public(self._jobs[job_id]), True
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id, "key": key, "dedup_key": dedup_key, "status": "queued",
+                "submitted_at": time.time(), "started_at": None, "finished_at": None,
+                "result": None, "error": None,
+            }
+            self._jobs[job_id] = job
+            self._by_key[dedup_key] = job_id
+        self._pool.submit(self._execute, job)
+        return self._public(job), False
+
+    def _execute(self, job: dict):
+        with self._lock:
+            job["status"] = "running"
+            job["started_at"] = time.time()
+        try:
+            result, error, status = self._runner(*job["key"]), None, "done"
+        except Exception as e:
+            result, error, status = None, str(e), "failed"
+        with self._lock:
+            job.update(status=status, result=result, error=error, finished_at=time.time())
+            self._latency.append((job["started_at"] - job["submitted_at"],
+                                  job["finished_at"] - job["started_at"]))
+            self._finished.append(job["job_id"])
+            while len(self._finished) > MAX_FINISHED:
+                old = self._jobs.pop(self._finished.popleft())
+                if self._by_key.get(old["dedup_key"]) == old["job_id"]:
+                    del self._by_key[old["dedup_key"]]
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = collections.Counter(j["status"] for j in self._jobs.values())
+            lat = list(self._latency)
+
+        def pct(values, q):
+            if not values:
+                return None
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+        waits, runs = [w for w, _ in lat], [r for _, r in lat]
+        return {
+            "queue_depth": counts["queued"],
+            "running": counts["running"],
+            "done": counts["done"],
+            "failed": counts["failed"],
+            "wait_seconds": {"p50": pct(waits, 0.5), "p95": pct(waits, 0.95)},
+            "run_seconds": {"p50": pct(runs, 0.5), "p95": pct(runs, 0.95)},
+        }
+
+    @staticmethod
+    def _public(job: dict) -> dict:
+        uid, zip_code, price, score = job["key"]
+        out = {k: v for k, v in job.items() if k not in ("key", "dedup_key")}
+        out.update(uid=uid, zip_code=zip_code, price=price, score=score,
+                   model_version=job["dedup_key"][0])
+        return out
@@ -1,13 +1,46 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
 import numpy as np
 import pandas as pd
-from sales.lstm_simple_preprocessing import MultiZipPreprocessor
-from keras.models import load_model
-from delta import get_delta
-from scipy.signal import savgol_filter
+from artifacts import CSV_PATH, HORIZON_MODELS
+from delta_surrogate import get_surrogate
+
+# Keras, scipy and sklearn (via the preprocessor) are imported on the code
+# paths that need them, so importing this module stays cheap.
+if TYPE_CHECKING:
+    from sales.lstm_simple_preprocessing import MultiZipPreprocessor
 # 在插值前对prices做平滑
 # Shared preprocessing once — this works because the CSV is the same
-CSV_PATH = "sales/Datasets_HOME_VALUE/condo.csv"
 LOOKBACK = 24
+FORECAST_TABLE_PATH = "forecast_table.csv"
+
+NUM_COLS = [
+    "lag_1", "lag_2", "lag_3", "lag_12",
+    "rolling_mean_6", "pct_change_1",
+    "sin_month", "cos_month",
+]
+
+_MODELS: dict = {}
+
+
+def get_delta(score, error) -> float:
+    """Δ from the exported grid surrogate if present, else from the quantum regressor."""
+    surrogate = get_surrogate()
+    if surrogate is not None:
+        return surrogate.predict(score, error)
+    from delta import get_delta as circuit_delta
+    return circuit_delta(score, error)
+
+
+def _get_model(model_file: str):
+    """Load a Keras model once per process and reuse it afterwards."""
+    if model_file not in _MODELS:
+        from keras.models import load_model
+        _MODELS[model_file] = load_model(model_file, compile=False)
+    return _MODELS[model_file]
 
 
 def get_forecast_by_uid(uid: int, path: str = "forecast_results.csv") -> dict[int, float]:
@@ -85,11 +118,7 @@ def forecast_single(zip_code: int,
     Returns a single point forecast HORIZON months ahead for `zip_code`.
     """
     lookback = out["lookback"]
-    num_cols = [
-        "lag_1", "lag_2", "lag_3", "lag_12",
-        "rolling_mean_6", "pct_change_1",
-        "sin_month", "cos_month",
-    ]
+    num_cols = NUM_COLS
 
     # -------- fetch last window for this ZIP --------
     df_zip = prep.long[prep.long.RegionName == zip_code].copy().reset_index(drop=True)
@@ -134,17 +163,152 @@ def get_latest_fv_from_csv(data_path: str, zip_code: int) -> float:
     latest_date = sorted(date_cols, key=pd.to_datetime)[-1]
     return float(df_latest[latest_date])
 
+def build_last_windows(prep: MultiZipPreprocessor, out: dict):
+    """
+    Stack the most recent `lookback` rows of every ZIP into one batch.
+
+    Returns
+    -------
+    zips : np.ndarray
+        ZIP codes, one per batch row, in panel order.
+    X_in : list[np.ndarray]
+        Model input ``[numeric (N, L, F), zip_id (N, L)]`` ready for
+        a single batched `model.predict`.
+    """
+    lookback = out["lookback"]
+    long = prep.long
+
+    counts = long.groupby("RegionName", sort=False).size()
+    eligible = counts.index[counts >= lookback]
+    # `long` is sorted by (RegionName, date), so tail() keeps each ZIP contiguous
+    tail = (
+        long[long.RegionName.isin(eligible)]
+        .groupby("RegionName", sort=False)
+        .tail(lookback)
+    )
+    n_zip = len(eligible)
+    zips = tail["RegionName"].values.reshape(n_zip, lookback)[:, 0]
+
+    X_num = out["scaler_X"].transform(tail[NUM_COLS].values.astype(float))
+    X_num = X_num.reshape(n_zip, lookback, len(NUM_COLS))
+    X_zid = tail["zip_id"].values.reshape(n_zip, lookback).astype("int32")
+    return zips, [X_num, X_zid]
+
+
+def forecast_all_zips(data_path: str = CSV_PATH,
+                      horizons: dict[int, str] = HORIZON_MODELS,
+                      batch_size: int = 1024) -> pd.DataFrame:
+    """
+    Build the ZIP × horizon baseline forecast table in one batched pass
+    per horizon (instead of one `forecast_single` call per ZIP).
+
+    The table also carries the last 12 observed months (horizons −12 … −1)
+    and the latest value (horizon 0), so a listing forecast can be derived
+    from it with `listing_forecast_from_table` without touching the models.
+
+    Returns
+    -------
+    pd.DataFrame
+        Long table with columns ``zip_code, horizon, predicted_price``.
+        Forecast horizons are raw (unsmoothed, delta = 0) model outputs.
+    """
+    from sales.lstm_simple_preprocessing import MultiZipPreprocessor
+
+    frames = []
+    history_added = False
+
+    for horizon, model_file in horizons.items():
+        logging.info("Forecasting %d months ahead for all ZIPs…", horizon)
+        prep = MultiZipPreprocessor(
+            data_path=data_path,
+            lookback=LOOKBACK,
+            horizon=horizon,
+        )
+        out = prep.run()
+
+        if not history_added:
+            hist = prep.long.groupby("RegionName", sort=False).tail(12).copy()
+            hist["horizon"] = hist.groupby("RegionName", sort=False).cumcount() - 12
+            frames.append(hist.rename(columns={"RegionName": "zip_code", "price": "predicted_price"})
+                          [["zip_code", "horizon", "predicted_price"]])
+            latest = prep.long.groupby("RegionName", sort=False).tail(1)
+            frames.append(pd.DataFrame({"zip_code": latest["RegionName"].values,
+                                        "horizon": 0,
+                                        "predicted_price": latest["price"].values}))
+            history_added = True
+
+        zips, X_in = build_last_windows(prep, out)
+        model = _get_model(model_file)
+        y_scaled = model.predict(X_in, batch_size=batch_size, verbose=0).ravel()
+        y_real = out["scaler_y"].inverse_transform(y_scaled.reshape(-1, 1)).ravel()
+        frames.append(pd.DataFrame({"zip_code": zips,
+                                    "horizon": horizon,
+                                    "predicted_price": y_real}))
+
+    table = pd.concat(frames, ignore_index=True)
+    return table.sort_values(["zip_code", "horizon"]).reset_index(drop=True)
+
+
+def save_forecast_table(table: pd.DataFrame, path: str = FORECAST_TABLE_PATH):
+    table.to_csv(path, index=False)
+
+
+def listing_forecast_from_table(zip_code: int,
+                                listing_price: int,
+                                score=5,
+                                table: pd.DataFrame | None = None,
+                                path: str = FORECAST_TABLE_PATH) -> dict[int, float]:
+    """
+    Derive a listing forecast from the precomputed ZIP table plus the
+    delta adjustment, in the same format as `input_handler`.
+
+    The delta is applied as a level shift of the ZIP curve (history and
+    forecasts); horizon 0 stays the unadjusted latest value.
+    """
+    if table is None:
+        table = pd.read_csv(path)
+    df_zip = table[table["zip_code"] == zip_code].sort_values("horizon")
+    if df_zip.empty:
+        raise ValueError(f"No forecast table rows for ZIP: {zip_code}")
+
+    by_h = dict(zip(df_zip["horizon"], df_zip["predicted_price"]))
+    fv_latest = float(by_h[0])
+    delta = get_delta(score, fv_latest - listing_price)
+
+    results = {h: p + delta for h, p in by_h.items() if h < 0}
+    forecast_keys = sorted(h for h in by_h if h > 0)
+    smoothed = _smooth([by_h[h] for h in forecast_keys])
+    for k, v in zip(forecast_keys, smoothed):
+        results[k] = float(v) + delta
+    results[0] = fv_latest
+    return results
+
+
+def _smooth(values):
+    from scipy.signal import savgol_filter
+    return savgol_filter(values, window_length=5, polyorder=2)
+
+
+def latest_fv(zip_code: int) -> float:
+    """Latest ZHVI value from the shared store when published, else from the CSV."""
+    from shared_store import get_store
+
+    store = get_store()
+    value = store.latest_value(zip_code) if store is not None else None
+    if value is None:
+        value = get_latest_fv_from_csv(CSV_PATH, zip_code)
+    return value
+
+
 def input_handler(uid:int,zip_code: int,listing_price:int, score=5):
-    forecast = {
-        10: "1-year.h5", 12: "1-year.h5", 14: "1-year.h5", 20: "1-year.h5", 24: "1-year.h5",
-        30: "3-year.h5", 36: "3-year.h5", 42: "3-year.h5",
-        45: "5-year.h5", 48: "5-year.h5", 55: "5-year.h5", 60: "5-year.h5", 65: "5-year.h5",
-    }
+    from sales.lstm_simple_preprocessing import MultiZipPreprocessor
 
-    error=get_latest_fv_from_csv(CSV_PATH, zip_code)-listing_price
+    forecast = HORIZON_MODELS
+
+    fv_latest = latest_fv(zip_code)
+    error=fv_latest-listing_price
     print("error is:",error)
-    print("last fv price:" , get_latest_fv_from_csv(CSV_PATH, zip_code))
-    fv_latest = get_latest_fv_from_csv(CSV_PATH, zip_code)
+    print("last fv price:" , fv_latest)
     delta = get_delta(score, error)
     print("Delta value:", delta)
 
@@ -167,7 +331,7 @@ def input_handler(uid:int,zip_code: int,listing_price:int, score=5):
             forecast_results.update(get_last_12_adjusted_prices(prep, zip_code))
             history_added = True
 
-        model = load_model(model_file, compile=False)
+        model = _get_model(model_file)
         price = forecast_single(zip_code, prep, out, model)
         print("For horizon", horizon, "predicted price:", price)
         raw_forecasts[horizon] = price
@@ -175,7 +339,7 @@ def input_handler(uid:int,zip_code: int,listing_price:int, score=5):
     # Smooth forecasted prices only
     sorted_forecast_keys = sorted(raw_forecasts.keys())
     sorted_forecast_vals = [raw_forecasts[k] for k in sorted_forecast_keys]
-    smoothed_vals = savgol_filter(sorted_forecast_vals, window_length=5, polyorder=2)
+    smoothed_vals = _smooth(sorted_forecast_vals)
 
     # Insert smoothed forecast into final result
     for k, v in zip(sorted_forecast_keys, smoothed_vals):
@@ -204,3 +368,9 @@ def save_forecast_to_csv(uid: int, zip_code: int, results: dict[int, float], pat
     # Append new data and save
     df_combined = pd.concat([df_existing, df_new], ignore_index=True)
     df_combined.to_csv(path, index=False)
+
+
+if __name__ == "__main__":
+    table = forecast_all_zips()
+    save_forecast_table(table)
+    print(f"Saved {table['zip_code'].nunique()} ZIPs × {table['horizon'].nunique()} horizons to {FORECAST_TABLE_PATH}")
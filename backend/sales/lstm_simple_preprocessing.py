@@ -12,11 +12,6 @@ Every fully complete ZIP is kept; the script:
    for inverse‑transforming predictions.
 """
 from __future__ import annotations
-import tensorflow as tf
-
-from tensorflow.keras.layers import Input, Embedding, Concatenate, LSTM, Dropout, Dense
-from tensorflow.keras.models import Model
-from tensorflow.keras.optimizers import Adam
 
 import logging
 from pathlib import Path
@@ -0,0 +1,171 @@
+"""
+Memory-mapped forecast store shared by every server worker on a node.
+
+The forecast table and the ZIP latest-value table are published once as
+plain ``.npy`` files under
+``<store_dir>/gen-<n>/``; workers open them with ``np.load(mmap_mode="r")``
+so all processes share the same page-cache pages and memory stays flat as
+workers are added. ``CURRENT`` holds the live generation number and is
+swapped atomically on publish; attached workers notice the change and
+re-map.
+
+Forecasts written to the CSV after a publish are not in the store;
+cache_intaker serves from the CSV until the store is republished.
+
+    python shared_store.py publish      # build a new generation
+"""
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+STORE_DIR = os.getenv("FORECAST_STORE_DIR", "forecast_store")
+KEEP_GENERATIONS = 2
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Publishing
+# ─────────────────────────────────────────────────────────────────────────────
+def current_generation(store_dir: str = STORE_DIR) -> int | None:
+    try:
+        with open(os.path.join(store_dir, "CURRENT")) as f:
+            return int(f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def publish(arrays: dict[str, np.ndarray], store_dir: str = STORE_DIR) -> int:
+    """Write `arrays` as a new generation and make it current."""
+    os.makedirs(store_dir, exist_ok=True)
+    gen = (current_generation(store_dir) or 0) + 1
+    gen_dir = os.path.join(store_dir, f"gen-{gen}")
+    os.makedirs(gen_dir)
+    for name, arr in arrays.items():
+        np.save(os.path.join(gen_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+
+    tmp = os.path.join(store_dir, "CURRENT.tmp")
+    with open(tmp, "w") as f:
+        f.write(str(gen))
+    os.replace(tmp, os.path.join(store_dir, "CURRENT"))
+
+    # attached workers keep their mappings even after the files are unlinked
+    for old in range(1, gen - KEEP_GENERATIONS + 1):
+        shutil.rmtree(os.path.join(store_dir, f"gen-{old}"), ignore_errors=True)
+    return gen
+
+
+def forecast_arrays(path: str = "forecast_results.csv") -> dict[str, np.ndarray]:
+    """uid-sorted CSR layout of forecast_results.csv."""
+    import pandas as pd
+
+    df = pd.read_csv(path).sort_values(["uid", "horizon"])
+    uids, starts = np.unique(df["uid"].values, return_index=True)
+    return {
+        "fc_uid": uids.astype(np.int64),
+        "fc_offsets": np.append(starts, len(df)).astype(np.int64),
+        "fc_horizon": df["horizon"].values.astype(np.int32),
+        "fc_price": df["predicted_price"].values.astype(np.float64),
+    }
+
+
+def latest_value_arrays(data_path: str) -> dict[str, np.ndarray]:
+    """ZIP → latest ZHVI value (same as model.get_latest_fv_from_csv, all ZIPs)."""
+    import pandas as pd
+
+    df = pd.read_csv(data_path)
+    date_cols = [c for c in df.columns if c.count('-') == 2]
+    latest_date = sorted(date_cols, key=pd.to_datetime)[-1]
+    df = df.drop_duplicates("RegionName").sort_values("RegionName")
+    return {
+        "zip_code": df["RegionName"].values.astype(np.int64),
+        "zip_latest": df[latest_date].values.astype(np.float64),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Attaching
+# ─────────────────────────────────────────────────────────────────────────────
+class SharedStore:
+    """Read-only view of the current generation; re-maps when it changes."""
+
+    def __init__(self, store_dir: str = STORE_DIR, refresh_interval: float = 5.0):
+        self.store_dir = store_dir
+        self.refresh_interval = refresh_interval
+        self.generation = None
+        self.arrays: dict[str, np.ndarray] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        gen = current_generation(self.store_dir)
+        if gen is None or gen == self.generation:
+            return
+        with self._lock:
+            if gen == self.generation:
+                return
+            gen_dir = os.path.join(self.store_dir, f"gen-{gen}")
+            self.arrays = {
+                name[:-4]: np.load(os.path.join(gen_dir, name), mmap_mode="r")
+                for name in os.listdir(gen_dir) if name.endswith(".npy")
+            }
+            self.generation = gen
+
+    def forecast(self, uid: int) -> dict[int, float] | None:
+        self.refresh()
+        a = self.arrays
+        if "fc_uid" not in a:
+            return None
+        i = int(np.searchsorted(a["fc_uid"], uid))
+        if i == len(a["fc_uid"]) or a["fc_uid"][i] != uid:
+            return None
+        lo, hi = a["fc_offsets"][i], a["fc_offsets"][i + 1]
+        return dict(zip(a["fc_horizon"][lo:hi].tolist(), a["fc_price"][lo:hi].tolist()))
+
+    def latest_value(self, zip_code: int) -> float | None:
+        self.refresh()
+        a = self.arrays
+        if "zip_code" not in a:
+            return None
+        i = int(np.searchsorted(a["zip_code"], zip_code))
+        if i == len(a["zip_code"]) or a["zip_code"][i] != zip_code:
+            return None
+        return float(a["zip_latest"][i])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SharedStore | None:
+    """Process-wide attachment, or None if nothing has been published."""
+    global _store
+    if _store is None:
+        if current_generation(STORE_DIR) is None:
+            return None
+        with _store_lock:
+            if _store is None:
+                _store = SharedStore(STORE_DIR)
+    return _store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from model import CSV_PATH
+
+    p = argparse.ArgumentParser(description="Publish a forecast store generation")
+    p.add_argument("command", choices=["publish"])
+    p.add_argument("--forecasts", default="forecast_results.csv")
+    p.add_argument("--data", default=CSV_PATH, help="ZHVI CSV for latest values")
+    args = p.parse_args()
+
+    arrays = {**forecast_arrays(args.forecasts), **latest_value_arrays(args.data)}
+    gen = publish(arrays)
+    print(f"Published generation {gen} to {STORE_DIR} ({', '.join(arrays)})")
@@ -0,0 +1,143 @@
+"""
+Startup warm-up and readiness tracking for the Flask backend.
+
+Each configured component is loaded once in a background thread and
+exercised with a dummy call, so the first real request doesn't pay for it.
+`/ready` reports per-component status and load time. A component that
+fails is retried with exponential backoff (``WARMUP_RETRY_MAX_S``, default
+60 s between attempts), so a transient error doesn't keep /ready at 503.
+
+app.py starts warm-up when the app is created (get_readiness); the loading
+itself happens on the warm-up thread, and ``WARMUP_COMPONENTS=`` (empty)
+disables it, as import_budget.py does.
+
+Components (``WARMUP_COMPONENTS``, comma-separated; default all):
+    forecast_store  cached forecast index (and shared store) used by /api/forecast
+    forecast_cache  content-addressed cache checked first by cache_intaker
+    delta           the delta predictor get_delta uses (grid surrogate when a
+                    current one is exported, else the quantum regressor)
+    models          Keras horizon models + one dummy predict each
+"""
+import os
+import threading
+import time
+
+
+def _warm_forecast_store():
+    from cache_intaker import STORE_CURRENT, _load_index
+    if os.path.exists(STORE_CURRENT):
+        from shared_store import get_store
+        get_store()
+    _load_index()
+
+
+def _warm_forecast_cache():
+    from cache_intaker import CONTENT_CACHE_DB
+    if not os.path.exists(CONTENT_CACHE_DB):
+        print("Warm-up: no forecast cache yet, skipping")
+        return
+    from forecast_cache import get_cache
+    get_cache().lookup_uid(-1)           # hashes the model version, opens the DB
+
+
+def _warm_delta():
+    from delta_surrogate import get_surrogate
+    predictor = get_surrogate()
+    if predictor is None:
+        from delta import get_predictor
+        predictor = get_predictor()
+    predictor.predict(5, 0.0)
+
+
+def _warm_models():
+    import numpy as np
+    from model import HORIZON_MODELS, LOOKBACK, NUM_COLS, _get_model
+
+    X_num = np.zeros((1, LOOKBACK, len(NUM_COLS)), dtype="float32")
+    X_zid = np.zeros((1, LOOKBACK), dtype="int32")
+    for model_file in dict.fromkeys(HORIZON_MODELS.values()):
+        _get_model(model_file).predict([X_num, X_zid], verbose=0)
+
+
+COMPONENTS = {
+    "forecast_store": _warm_forecast_store,
+    "forecast_cache": _warm_forecast_cache,
+    "delta": _warm_delta,
+    "models": _warm_models,
+}
+DEFAULT_COMPONENTS = ",".join(COMPONENTS)
+RETRY_BASE_S = 1.0
+RETRY_MAX_S = float(os.getenv("WARMUP_RETRY_MAX_S", 60))
+
+
+class Readiness:
+    """Thread-safe per-component status: pending → loading → ready | failed (retried)."""
+
+    def __init__(self, names):
+        self._lock = threading.Lock()
+        self._status = {name: {"status": "pending", "seconds": None, "attempts": 0} for name in names}
+
+    def _set(self, name, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def _warm(self, name) -> bool:
+        with self._lock:
+            self._status[name].update(status="loading")
+            self._status[name]["attempts"] += 1
+        t0 = time.perf_counter()
+        try:
+            COMPONENTS[name]()
+        except Exception as e:
+            self._set(name, status="failed", seconds=round(time.perf_counter() - t0, 3), error=str(e))
+            print(f"Warm-up failed for {name}: {e}")
+            return False
+        self._set(name, status="ready", seconds=round(time.perf_counter() - t0, 3), error=None)
+        print(f"Warm-up: {name} ready in {time.perf_counter() - t0:.2f}s")
+        return True
+
+    def run(self):
+        pending = list(self._status)
+        delay = RETRY_BASE_S
+        while True:
+            pending = [name for name in pending if not self._warm(name)]
+            if not pending:
+                return
+            print(f"Warm-up: retrying {', '.join(pending)} in {delay:.1f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX_S)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            components = {name: dict(s) for name, s in self._status.items()}
+        return {
+            "ready": all(s["status"] == "ready" for s in components.values()),
+            "components": components,
+        }
+
+
+def start_warmup(components: str | None = None) -> Readiness:
+    """Start warming the configured components in a daemon thread."""
+    if components is None:
+        components = os.getenv("WARMUP_COMPONENTS", DEFAULT_COMPONENTS)
+    names = [c.strip() for c in components.split(",") if c.strip()]
+    unknown = [n for n in names if n not in COMPONENTS]
+    if unknown:
+        raise ValueError(f"Unknown warm-up components: {unknown}")
+    readiness = Readiness(names)
+    threading.Thread(target=readiness.run, name="warmup", daemon=True).start()
+    return readiness
+
+
+_readiness = None
+_readiness_lock = threading.Lock()
+
+
+def get_readiness() -> Readiness:
+    """Process-wide readiness; the first call (from app.py) starts the warm-up thread."""
+    global _readiness
+    if _readiness is None:
+        with _readiness_lock:
+            if _readiness is None:
+                _readiness = start_warmup()
+    return _readiness
@@ -29,6 +29,7 @@ logging.basicConfig(level=logging.INFO,
                     datefmt="%H:%M:%S")
 
 from lstm_simple_preprocessing import MultiZipPreprocessor
+from recursive_forecast import RecursiveForecaster
 
 DATA_PATH = "/content/Zip_zhvi_bdrmcnt_1_uc_sfrcondo_tier_0.33_0.67_sm_sa_month.csv"  # update
 
@@ -99,33 +100,35 @@ ax[1].plot(history.history['val_mae'], label='val')
 ax[1].set_title("MAE"); ax[1].legend()
 plt.tight_layout(); plt.show()
 
-from sklearn.metrics import mean_squared_error, mean_absolute_error, mean_absolute_percentage_error
 import numpy as np
+from streaming_metrics import StreamingErrorStats
 
 X_test, y_test_scaled = out["splits"]["test"]
-y_pred_scaled = model.predict(split_inputs(X_test)).ravel()
-
-# inverse-transform
 scaler_y = out["scaler_y"]
-y_test = scaler_y.inverse_transform(y_test_scaled.reshape(-1,1)).ravel()
-y_pred = scaler_y.inverse_transform(y_pred_scaled.reshape(-1,1)).ravel()
-
-rmse = mean_squared_error(y_test, y_pred, squared=False)
-mae  = mean_absolute_error(y_test, y_pred)
-mape = mean_absolute_percentage_error(y_test, y_pred) * 100
-print(f"Test RMSE ${rmse:,.0f} | MAE ${mae:,.0f} | MAPE {mape:.2f}%")
-
-X_test, y_test_scaled = out["splits"]["test"]
-
-# ---- 1. unscale both y_true and y_pred ----
-y_true = out["scaler_y"].inverse_transform(y_test_scaled.reshape(-1,1)).ravel()
-
-# lag-1 price in **scaled** units
-lag1_scaled = X_test[:, -1, 0]
-lag1_real   = out["scaler_y"].inverse_transform(lag1_scaled.reshape(-1,1)).ravel()
-
-mape_naive = mean_absolute_percentage_error(y_true, lag1_real)*100
-print(f"Naïve one-step MAPE  = {mape_naive:.2f}%")
+EVAL_BATCH = 8192
+
+# stream the test split in batches: model vs. naïve lag-1 baseline
+stats       = StreamingErrorStats(n_zip)
+stats_naive = StreamingErrorStats(n_zip)
+for start in range(0, len(X_test), EVAL_BATCH):
+    X_b = X_test[start:start + EVAL_BATCH]
+    zid = X_b[:, -1, n_num]
+    y_b = scaler_y.inverse_transform(y_test_scaled[start:start + EVAL_BATCH].reshape(-1,1))
+    y_p = scaler_y.inverse_transform(model.predict_on_batch(split_inputs(X_b)).reshape(-1,1))
+    # lag-1 price in **scaled** units
+    lag1_real = scaler_y.inverse_transform(X_b[:, -1, 0].reshape(-1,1))
+    stats.update(y_b, y_p, zid)
+    stats_naive.update(y_b, lag1_real, zid)
+
+m = stats.result()
+print(f"Test RMSE ${m['rmse']:,.0f} | MAE ${m['mae']:,.0f} | MAPE {m['mape']:.2f}%")
+print(f"Naïve one-step MAPE  = {stats_naive.result()['mape']:.2f}%")
+per_zip = stats.per_zip(out["zip_lookup"])
+
+# scatter on a fixed-size sample instead of the whole split
+idx = np.sort(np.random.default_rng(0).choice(len(X_test), min(5000, len(X_test)), replace=False))
+y_test = scaler_y.inverse_transform(y_test_scaled[idx].reshape(-1,1)).ravel()
+y_pred = scaler_y.inverse_transform(model.predict(split_inputs(X_test[idx]), verbose=0).reshape(-1,1)).ravel()
 
 plt.figure(figsize=(6,6))
 plt.scatter(y_test, y_pred, alpha=1.0)
@@ -147,60 +150,11 @@ def forecast_next_12_months(zip_code: int,
     Predict the next 12 monthly prices for a single ZIP code
     using the already-trained global LSTM.
     Returns a list of 12 real-dollar prices.
+
+    Thin wrapper around `RecursiveForecaster`; pass many ZIPs to
+    `RecursiveForecaster.forecast` directly to roll them in one batch.
     """
-    lookback = out["lookback"]
-    num_cols = [
-        "lag_1", "lag_2", "lag_3", "lag_12",
-        "rolling_mean_6", "pct_change_1",
-        "sin_month", "cos_month",
-    ]
-    df_zip = prep.long[prep.long.RegionName == zip_code].copy().reset_index(drop=True)
-    if len(df_zip) < lookback:
-        raise ValueError(f"ZIP {zip_code} has only {len(df_zip)} rows (need ≥{lookback}).")
-
-    zid    = out["zip_lookup"][zip_code]
-    n_num  = out["n_numeric"]
-    preds  = []
-
-    # start with the most recent 24-month window
-    window_df = df_zip.iloc[-lookback:].copy()
-
-    for _ in range(12):                       # roll forward 12 steps
-        # 1️⃣  build scaled window tensor
-        X_num = window_df[num_cols].values.astype(float)
-        X_num = out["scaler_X"].transform(X_num)
-        X_full = np.hstack([X_num, np.full((lookback, 1), zid)])
-        X_full = X_full[np.newaxis, :, :]
-
-        X_input = [
-            X_full[:, :, :n_num],                           # numeric feats
-            X_full[:, :, n_num:].astype("int32").squeeze(-1)  # zip_id seq
-        ]
-
-        # 2️⃣  predict next-month price & inverse-scale
-        y_scaled = model.predict(X_input, verbose=0).ravel()
-        y_real   = out["scaler_y"].inverse_transform(y_scaled.reshape(-1, 1)).ravel()[0]
-        preds.append(float(y_real))
-
-        # 3️⃣  append the prediction to the window
-        next_row = window_df.iloc[-1].copy()
-        next_row["date"]  = next_row["date"] + pd.DateOffset(months=1)
-        next_row["price"] = y_real
-        window_df = pd.concat([window_df.iloc[1:], pd.DataFrame([next_row])]).reset_index(drop=True)
-
-        # 4️⃣  recompute lag & rolling features for the updated window
-        window_df["lag_1"]  = window_df["price"].shift(1)
-        window_df["lag_2"]  = window_df["price"].shift(2)
-        window_df["lag_3"]  = window_df["price"].shift(3)
-        window_df["lag_12"] = window_df["price"].shift(12)
-        window_df["rolling_mean_6"] = window_df["price"].shift(1).rolling(6).mean()
-        window_df["pct_change_1"]   = window_df["price"].pct_change().shift(1)
-        m = window_df["date"].dt.month
-        window_df["sin_month"] = np.sin(2 * np.pi * m / 12)
-        window_df["cos_month"] = np.cos(2 * np.pi * m / 12)
-        window_df = window_df.fillna(method="bfill")        # fills first few NaNs
-
-    return preds
+    return RecursiveForecaster(prep, out, model).forecast([zip_code], steps=12)[0].tolist()
 
 from tensorflow.keras.models import load_model
 
@@ -0,0 +1,156 @@
+"""Walk‑forward backtest of the global LSTM across every ZIP and horizon.
+
+1. The engineered panel is laid out once as a dense
+   `[n_zip, n_months, n_features]` cube (NaN where a row was dropped).
+2. For each horizon the cube is scaled once; each rolling origin is then a
+   slice of that cube and is predicted for **all ZIPs in one batch**.
+3. Every (ZIP, horizon, origin) is scored against the truth and the naive
+   lag‑1 baseline used in the Colab pipeline, and aggregated into per‑ZIP
+   and per‑horizon error tables.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lstm_simple_preprocessing import NUM_COLS, MultiZipPreprocessor
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s ▶ %(message)s")
+
+
+class WalkForwardBacktester:
+    """Rolling‑origin evaluation for one panel and one model per horizon."""
+
+    def __init__(self, prep: MultiZipPreprocessor, lookback: int = 24, batch_size: int = 4096):
+        self.lookback = lookback
+        self.batch_size = batch_size
+        self._build_cube(prep.long)
+
+    # ------------------------------------------------------------------
+    # 1. Dense panel cube
+    # ------------------------------------------------------------------
+    def _build_cube(self, long: pd.DataFrame):
+        zi, self.zips = pd.factorize(long["RegionName"], sort=True)
+        di, self.dates = pd.factorize(long["date"], sort=True)
+        n, T, F = len(self.zips), len(self.dates), len(NUM_COLS)
+
+        self.feats = np.full((n, T, F), np.nan)
+        self.feats[zi, di] = long[NUM_COLS].values.astype(float)
+        self.prices = np.full((n, T), np.nan)
+        self.prices[zi, di] = long["price"].values
+        self.zip_ids = np.zeros(n, dtype="int32")
+        self.zip_ids[zi] = long["zip_id"].values
+        logging.info("Backtest cube: %d ZIPs × %d months", n, T)
+
+    # ------------------------------------------------------------------
+    # 2. Rolling origins per horizon
+    # ------------------------------------------------------------------
+    def _origins(self, horizon: int, n_origins: int, stride: int) -> np.ndarray:
+        # window rows [i-L, i) → target row i+horizon (as in _make_sequences)
+        last = len(self.dates) - horizon - 1
+        origins = np.arange(last, self.lookback - 1, -stride)[:n_origins]
+        return origins[::-1]
+
+    def _run_horizon(self, horizon: int, model, out: Dict, n_origins: int, stride: int) -> pd.DataFrame:
+        L, (n, T, F) = self.lookback, self.feats.shape
+        # MinMaxScaler passes NaN through, so masked rows stay masked
+        scaled = out["scaler_X"].transform(self.feats.reshape(-1, F)).reshape(n, T, F)
+        zid = np.repeat(self.zip_ids[:, None], L, axis=1)
+        scaler_y = out["scaler_y"]
+
+        frames = []
+        for i in self._origins(horizon, n_origins, stride):
+            X = scaled[:, i - L:i]
+            y_true = self.prices[:, i + horizon]
+            ok = ~np.isnan(X).any(axis=(1, 2)) & ~np.isnan(y_true)
+            if not ok.any():
+                continue
+
+            y_scaled = model.predict([X[ok], zid[ok]], batch_size=self.batch_size, verbose=0).ravel()
+            frames.append(pd.DataFrame({
+                "zip_code": self.zips[ok],
+                "horizon": horizon,
+                "origin": self.dates[i - 1],
+                "y_true": y_true[ok],
+                "y_pred": scaler_y.inverse_transform(y_scaled.reshape(-1, 1)).ravel(),
+                "y_naive": self.feats[ok, i - 1, 0],          # lag_1 at the origin
+            }))
+        if not frames:
+            # an empty horizon would otherwise pass the gate unscored
+            raise ValueError(
+                f"No complete backtest windows for horizon {horizon}: each origin needs "
+                f"lookback + horizon + 1 = {L + horizon + 1} months, the panel has {T}")
+        return pd.concat(frames, ignore_index=True)
+
+    # ------------------------------------------------------------------
+    # 3. public driver
+    # ------------------------------------------------------------------
+    def run(self, models: Dict[int, Tuple[object, Dict]], n_origins: int = 12,
+            stride: int = 1) -> Dict[str, pd.DataFrame]:
+        """Backtest every horizon.
+
+        `models` maps horizon → (keras model, preprocessor `out` holding that
+        horizon's scalers).  Returns the raw predictions plus per‑ZIP and
+        per‑horizon error tables.
+        """
+        preds = []
+        for horizon, (model, out) in sorted(models.items()):
+            logging.info("Backtesting horizon %d over %d origins…", horizon, n_origins)
+            preds.append(self._run_horizon(horizon, model, out, n_origins, stride))
+        preds = pd.concat(preds, ignore_index=True)
+
+        return {
+            "predictions": preds,
+            "per_zip": summarize(preds, ["zip_code", "horizon"]),
+            "per_horizon": summarize(preds, ["horizon"]),
+        }
+
+
+def summarize(preds: pd.DataFrame, by) -> pd.DataFrame:
+    """RMSE / MAE / MAPE for model and naive baseline, plus skill vs naive."""
+    err = preds["y_pred"] - preds["y_true"]
+    err_n = preds["y_naive"] - preds["y_true"]
+    tmp = preds[by].assign(
+        se=err ** 2, ae=err.abs(), ape=(err / preds["y_true"]).abs() * 100,
+        se_n=err_n ** 2, ae_n=err_n.abs(), ape_n=(err_n / preds["y_true"]).abs() * 100,
+    )
+    g = tmp.groupby(by).mean()
+    table = pd.DataFrame({
+        "n": tmp.groupby(by).size(),
+        "rmse": np.sqrt(g["se"]),
+        "mae": g["ae"],
+        "mape": g["ape"],
+        "naive_rmse": np.sqrt(g["se_n"]),
+        "naive_mae": g["ae_n"],
+        "naive_mape": g["ape_n"],
+    })
+    table["skill"] = 1 - table["mae"] / table["naive_mae"]
+    return table.reset_index()
+
+
+def passes_gate(per_horizon: pd.DataFrame, min_skill: float = 0.0,
+                max_mape: float | None = None) -> bool:
+    """Deployment gate: beat the naive baseline (and an optional MAPE cap) on every horizon."""
+    ok = (per_horizon["skill"] >= min_skill).all()
+    if max_mape is not None:
+        ok = ok and (per_horizon["mape"] <= max_mape).all()
+    return bool(ok)
+
+
+if __name__ == "__main__":
+    from tensorflow.keras.models import load_model
+
+    prep = MultiZipPreprocessor(
+        "Datasets_HOME_VALUES/Zip_zhvi_bdrmcnt_3_uc_sfrcondo_tier_0.33_0.67_sm_sa_month.csv",
+        lookback=24,
+    )
+    out = prep.run()
+    model = load_model("best_global_lstm.h5", compile=False)
+
+    result = WalkForwardBacktester(prep, lookback=out["lookback"]).run({out["horizon"]: (model, out)})
+    result["per_zip"].to_csv("backtest_per_zip.csv", index=False)
+    print(result["per_horizon"].to_string(index=False))
+    print("Gate:", "PASS" if passes_gate(result["per_horizon"]) else "FAIL")
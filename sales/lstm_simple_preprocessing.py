@@ -23,6 +23,12 @@ from sklearn.preprocessing import MinMaxScaler
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s ▶ %(message)s")
 
+NUM_COLS = [
+    "lag_1", "lag_2", "lag_3", "lag_12",
+    "rolling_mean_6", "pct_change_1",
+    "sin_month", "cos_month",
+]                                  # -- 8 numeric features, model column order
+
 
 class MultiZipPreprocessor:
     """Panel pre‑processor for a single housing‑type ZHVI file."""
@@ -102,11 +108,7 @@ class MultiZipPreprocessor:
         plus
           seq_zip : [samples]    (integer ZIP id for each window)
         """
-        feat_cols = [
-            "lag_1", "lag_2", "lag_3", "lag_12",
-            "rolling_mean_6", "pct_change_1",
-            "sin_month", "cos_month",
-        ]                              # -- 8 numeric features
+        feat_cols = NUM_COLS
         # numeric features first … zip_id last (will NOT be scaled)
         num_feat = self.long[feat_cols].values.astype(float)
         zip_feat = self.long["zip_id"].values.reshape(-1, 1)
@@ -172,16 +174,22 @@ class MultiZipPreprocessor:
       self.scaler_y.fit(splits["train"][1].reshape(-1, 1))
 
       for key, (X_raw, y_raw) in splits.items():
-          X_num = X_raw[:, :, :num_idx].reshape(-1, num_idx)
-          X_num = self.scaler_X.transform(X_num).reshape(
-                      X_raw.shape[0], self.lookback, num_idx)
-          X_scaled = np.concatenate([X_num, X_raw[:, :, num_idx:]], axis=-1)
-          y_scaled = self.scaler_y.transform(y_raw.reshape(-1, 1)).ravel()
+          X_scaled, y_scaled = self._scale(X_raw, y_raw)
           splits[key] = (X_scaled, y_scaled)
           logging.info("%s split → %d sequences", key.capitalize(), len(X_scaled))
 
       self.splits = splits
 
+    def _scale(self, X_raw: np.ndarray, y_raw: np.ndarray):
+        """Apply the fitted scalers; the zip_id column is passed through."""
+        num_idx = X_raw.shape[2] - 1
+        X_num = X_raw[:, :, :num_idx].reshape(-1, num_idx)
+        X_num = self.scaler_X.transform(X_num).reshape(
+                    X_raw.shape[0], self.lookback, num_idx)
+        X_scaled = np.concatenate([X_num, X_raw[:, :, num_idx:]], axis=-1)
+        y_scaled = self.scaler_y.transform(y_raw.reshape(-1, 1)).ravel()
+        return X_scaled, y_scaled
+
     # ------------------------------------------------------------------
     # 5. public driver
     # ------------------------------------------------------------------
@@ -198,7 +206,50 @@ class MultiZipPreprocessor:
             "scaler_X": self.scaler_X,
             "scaler_y": self.scaler_y,
             "zip_lookup": self.zip_lookup,
-            "horizon": self.horizon
+            "horizon": self.horizon,
+            "last_date": self.long["date"].max(),
+        }
+
+    # ------------------------------------------------------------------
+    # 6. incremental driver (new months only)
+    # ------------------------------------------------------------------
+    def run_incremental(self, since, scaler_X: MinMaxScaler, scaler_y: MinMaxScaler,
+                        zip_lookup: Dict[str, int]) -> Dict:
+        """Build only the windows whose target month is after `since`.
+
+        Scalers and ZIP ids come from the earlier full run, so the new
+        windows live in the same space as the trained model.  Features are
+        engineered on the tail of the panel those windows need
+        (lookback + horizon + 12 months of lag history), not the whole file.
+        """
+        since = pd.Timestamp(since)
+        self._load_and_melt()
+
+        first_target = since + pd.DateOffset(months=1)
+        cutoff = first_target - pd.DateOffset(months=self.horizon + self.lookback + 12)
+        long = self.long[self.long["date"] >= cutoff]
+
+        unknown = set(long["RegionName"].unique()) - set(zip_lookup)
+        if unknown:
+            logging.info("Skipping %d ZIPs unseen at training time", len(unknown))
+        long = long[long["RegionName"].isin(list(zip_lookup))].copy()
+        long["zip_id"] = long["RegionName"].map(zip_lookup)
+        self.long = long.reset_index(drop=True)
+        self.zip_lookup = zip_lookup
+
+        self._add_lags()
+        self._make_sequences()
+        if len(self.seq_X) == 0:
+            raise ValueError(f"No new windows after {since.date()}")
+
+        self.scaler_X, self.scaler_y = scaler_X, scaler_y
+        X_new, y_new = self._scale(self.seq_X, self.seq_y)
+        logging.info("Incremental windows after %s: %d", since.date(), len(X_new))
+        return {
+            "recent": (X_new, y_new),
+            "lookback": self.lookback,
+            "horizon": self.horizon,
+            "last_date": self.long["date"].max(),
         }
 
 
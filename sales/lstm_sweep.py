@@ -0,0 +1,209 @@
+"""Parallel hyper‑parameter sweep over *GlobalLSTMTrainer*.
+
+* The panel is pre‑processed **once per (input file, lookback, horizon)** —
+  the cache directory is keyed on a hash of the CSV, so refreshed data is
+  never trained on stale splits — and the splits are written as `.npy` files; every worker opens them with
+  `np.load(mmap_mode="r")` and `GlobalLSTMTrainer.train` feeds `fit` batch
+  by batch from the memmaps (`WindowBatches`), so the dataset is shared
+  through the page cache instead of being copied into each process.
+* Trials run in a spawn‑based process pool, each with a bounded TensorFlow
+  thread count (cores ÷ workers).  On Python ≥ 3.11 every trial gets a
+  fresh process (`max_tasks_per_child=1`); older versions reuse workers, so
+  peak RSS then covers all trials a worker has run.
+* Every finished trial is appended to `results.csv` with its early‑stopping
+  outcome, test metrics, wall time and peak RSS.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import pickle
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from lstm_simple_preprocessing import MultiZipPreprocessor
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s ▶ %(message)s")
+
+DATA_KEYS = ("lookback", "horizon")
+MODEL_KEYS = ("lstm_units", "dropout", "emb_dim")
+
+
+# ----------------------------------------------------------------------
+# 1. Shared, memory-mapped datasets
+# ----------------------------------------------------------------------
+def file_digest(path: str | Path) -> str:
+    """Short content hash of the input panel."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def prepare_dataset(data_path: str | Path, lookback: int, horizon: int, out_dir: Path,
+                    digest: str | None = None) -> Path:
+    """Pre‑process once and dump splits + meta; reuse if already on disk for this input."""
+    digest = digest or file_digest(data_path)
+    ds_dir = out_dir / f"data_{digest}_L{lookback}_H{horizon}"
+    if (ds_dir / "meta.pkl").exists():
+        return ds_dir
+    ds_dir.mkdir(parents=True, exist_ok=True)
+
+    prep = MultiZipPreprocessor(data_path, lookback=lookback)
+    prep.horizon = horizon
+    out = prep.run()
+    for split, (X, y) in out["splits"].items():
+        np.save(ds_dir / f"X_{split}.npy", X.astype("float32"))
+        np.save(ds_dir / f"y_{split}.npy", y.astype("float32"))
+    meta = {k: v for k, v in out.items() if k != "splits"}
+    with open(ds_dir / "meta.pkl", "wb") as f:
+        pickle.dump(meta, f)
+    return ds_dir
+
+
+def load_dataset(ds_dir: Path) -> Dict:
+    """Rebuild a preprocessor `out` dict backed by memory-mapped splits."""
+    with open(ds_dir / "meta.pkl", "rb") as f:
+        out = pickle.load(f)
+    out["splits"] = {
+        split: (np.load(ds_dir / f"X_{split}.npy", mmap_mode="r"),
+                np.load(ds_dir / f"y_{split}.npy", mmap_mode="r"))
+        for split in ("train", "val", "test")
+    }
+    return out
+
+
+# ----------------------------------------------------------------------
+# 2. Worker side
+# ----------------------------------------------------------------------
+def _init_worker(n_threads: int):
+    # must be set before TensorFlow creates its thread pools
+    for var in ("OMP_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+        os.environ[var] = str(n_threads)
+
+
+def _run_trial(trial_id: int, ds_dir: str, params: Dict, epochs: int, batch: int,
+               patience: int, n_threads: int) -> Dict:
+    import tensorflow as tf
+    from lstm_training import GlobalLSTMTrainer
+
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(1, n_threads // 2))
+
+    t0 = time.perf_counter()
+    out = load_dataset(Path(ds_dir))
+    trainer = GlobalLSTMTrainer(data_path="", lookback=out["lookback"])
+    trainer.out = out
+    trainer.build_model(**{k: params[k] for k in MODEL_KEYS})
+    history = trainer.train(
+        epochs=epochs, batch=batch, patience=patience,
+        checkpoint_path=str(Path(ds_dir).parent / f"trial_{trial_id:03d}.h5"),
+        verbose=0,
+    )
+    metrics = trainer.evaluate()
+
+    val_loss = history.history["val_loss"]
+    return {
+        "trial": trial_id,
+        **{k: params[k] for k in DATA_KEYS + MODEL_KEYS},
+        "best_val_loss": float(np.min(val_loss)),
+        "best_epoch": int(np.argmin(val_loss)) + 1,
+        "epochs_run": len(val_loss),
+        **{k: float(v) for k, v in metrics.items()},
+        "wall_time_s": time.perf_counter() - t0,
+        # ru_maxrss is KiB on Linux; per trial when each gets a fresh process
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# ----------------------------------------------------------------------
+# 3. public driver
+# ----------------------------------------------------------------------
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*grid.values())]
+
+
+def run_sweep(data_path: str | Path, grid: Dict[str, List], out_dir: str | Path = "sweeps",
+              n_workers: int | None = None, epochs: int = 50, batch: int = 64,
+              patience: int = 5) -> pd.DataFrame:
+    """Train every grid combination in parallel and return the results table.
+
+    `grid` maps any of lookback, horizon, lstm_units, dropout, emb_dim to a
+    list of values; missing keys use the trainer defaults.
+    """
+    defaults = {"lookback": 24, "horizon": 12, "lstm_units": (128, 64),
+                "dropout": 0.2, "emb_dim": 16}
+    trials = [{**defaults, **p} for p in expand_grid(grid)]
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results_path = out_dir / "results.csv"
+
+    digest = file_digest(data_path)
+    datasets = {}
+    for p in trials:
+        key = (p["lookback"], p["horizon"])
+        if key not in datasets:
+            datasets[key] = prepare_dataset(data_path, *key, out_dir, digest)
+
+    cores = os.cpu_count() or 1
+    n_workers = min(n_workers or cores, len(trials))
+    n_threads = max(1, cores // n_workers)
+    logging.info("Sweep: %d trials on %d workers × %d threads", len(trials), n_workers, n_threads)
+
+    # max_tasks_per_child needs Python 3.11+
+    fresh = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+    if not fresh:
+        logging.info("Python < 3.11: workers are reused across trials")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(n_threads,),
+                             **fresh) as pool:
+        futures = {
+            pool.submit(_run_trial, i, str(datasets[(p["lookback"], p["horizon"])]),
+                        p, epochs, batch, patience, n_threads): i
+            for i, p in enumerate(trials)
+        }
+        for fut in as_completed(futures):
+            try:
+                row = fut.result()
+            except Exception as e:
+                logging.info("Trial %d failed: %s", futures[fut], e)
+                continue
+            rows.append(row)
+            pd.DataFrame([row]).to_csv(results_path, mode="a", index=False,
+                                       header=not results_path.exists())
+            logging.info("Trial %d → val_loss %.5f | MAPE %.2f%% | %.0fs | %.0f MB",
+                         row["trial"], row["best_val_loss"], row["mape"],
+                         row["wall_time_s"], row["peak_rss_mb"])
+
+    if not rows:
+        logging.info("Sweep: all %d trials failed", len(trials))
+        return pd.DataFrame(rows)
+    return pd.DataFrame(rows).sort_values("best_val_loss").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    results = run_sweep(
+        "Datasets_HOME_VALUES/Zip_zhvi_bdrmcnt_3_uc_sfrcondo_tier_0.33_0.67_sm_sa_month.csv",
+        grid={
+            "lstm_units": [(128, 64), (64, 32)],
+            "dropout": [0.1, 0.2],
+            "emb_dim": [8, 16],
+        },
+    )
+    print(results.head(10).to_string(index=False))
@@ -7,27 +7,78 @@ Key points
 * `zip_id` passes through an Embedding layer and is concatenated with numeric
   timesteps.
 * Metrics are reported in **real dollars** via inverse–transform.
+* `save_checkpoint` / `incremental_update` fine-tune an existing model on
+  newly published months (plus a replay sample) instead of retraining.
+
+Checkpoint directory layout::
+
+    model.keras   weights + optimizer state
+    meta.pkl      scalers, zip_lookup, last trained month
+    replay.npz    bounded sample of past (scaled) training windows
+    pending.npz   new windows of an update in progress (resume marker)
+    *.tmp.*       model / replay staged by an update until it commits
+    backup/       mid-fit state written by BackupAndRestore
+
+An update commits when `meta.pkl` is atomically replaced with the new
+`last_date`; the staged files are swapped in afterwards, and an update that
+crashed after committing is completed (not re-trained) on the next call.
 """
 from __future__ import annotations
 
 import logging
+import math
+import os
+import pickle
 from pathlib import Path
 from typing import Dict
 
 import numpy as np
+import pandas as pd
 import tensorflow as tf
-from sklearn.metrics import mean_absolute_error, mean_squared_error, mean_absolute_percentage_error
-from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau, ModelCheckpoint
+from tensorflow.keras.callbacks import (BackupAndRestore, EarlyStopping, ReduceLROnPlateau,
+                                        ModelCheckpoint)
 from tensorflow.keras.layers import (Concatenate, Dense, Dropout, Embedding, Input,
                                      LSTM)
 from tensorflow.keras.models import Model
 from tensorflow.keras.optimizers import Adam
 
 from lstm_simple_preprocessing import MultiZipPreprocessor
+from streaming_metrics import StreamingErrorStats
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s ▶ %(message)s")
 
 
+class WindowBatches(tf.keras.utils.Sequence):
+    """Feed `fit` one batch of windows at a time.
+
+    Only the rows of the current batch are read (and cast) from `X`/`y`, so
+    memory-mapped splits stay in the shared page cache instead of being
+    copied whole into every process that trains on them.
+    """
+
+    def __init__(self, X, y, split_inputs, batch: int, shuffle: bool = False, seed: int = 0):
+        super().__init__()
+        self.X, self.y = X, y
+        self.split_inputs = split_inputs
+        self.batch = batch
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.order = np.arange(len(X))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return math.ceil(len(self.X) / self.batch)
+
+    def __getitem__(self, i):
+        # sorted rows keep reads from the memmap close together
+        idx = np.sort(self.order[i * self.batch:(i + 1) * self.batch])
+        return tuple(self.split_inputs(np.asarray(self.X[idx]))), np.asarray(self.y[idx])
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.order)
+
+
 class GlobalLSTMTrainer:
     """Train a single global LSTM for all ZIPs of one housing‑type file."""
 
@@ -38,6 +89,7 @@ class GlobalLSTMTrainer:
         self.out: Dict | None = None
         self.model: Model | None = None
         self.history = None
+        self.per_zip_metrics = None
 
     # ------------------------------------------------------------------
     def preprocess(self) -> Dict:
@@ -81,7 +133,8 @@ class GlobalLSTMTrainer:
         return [num, zid.squeeze(-1)]
 
     # ------------------------------------------------------------------
-    def train(self, epochs=100, batch=64, patience=10):
+    def train(self, epochs=100, batch=64, patience=10,
+              checkpoint_path="best_global_lstm.h5", verbose=1):
         if self.model is None:
             raise RuntimeError("Build model first")
         X_train, y_train = self.out["splits"]["train"]
@@ -90,45 +143,206 @@ class GlobalLSTMTrainer:
         callbacks = [
             EarlyStopping(patience=patience, monitor="val_loss", restore_best_weights=True),
             ReduceLROnPlateau(patience=patience//2, monitor="val_loss", factor=0.5, verbose=1),
-            ModelCheckpoint("best_global_lstm.h5", save_best_only=True, monitor="val_loss", verbose=0),
+            ModelCheckpoint(checkpoint_path, save_best_only=True, monitor="val_loss", verbose=0),
         ]
 
+        if isinstance(X_train, np.memmap):
+            # splits opened with mmap_mode="r" (see lstm_sweep): stream batches
+            self.history = self.model.fit(
+                WindowBatches(X_train, y_train, self._split_inputs, batch, shuffle=True),
+                validation_data=WindowBatches(X_val, y_val, self._split_inputs, batch),
+                epochs=epochs,
+                verbose=verbose,
+                callbacks=callbacks,
+            )
+            return self.history
+
         self.history = self.model.fit(
             self._split_inputs(X_train),
             y_train,
             validation_data=(self._split_inputs(X_val), y_val),
             epochs=epochs,
             batch_size=batch,
-            verbose=1,
+            verbose=verbose,
             callbacks=callbacks,
         )
         return self.history
 
     # ------------------------------------------------------------------
-    def evaluate(self):
+    def evaluate(self, batch_size: int = 8192):
+        """Score the test split in batches with streaming accumulators.
+
+        Only one batch of predictions is alive at a time; per‑ZIP metrics are
+        kept in `self.per_zip_metrics`.
+        """
         if self.model is None:
             raise RuntimeError("Need a trained model")
         X_test, y_test_scaled = self.out["splits"]["test"]
-        y_pred_scaled = self.model.predict(self._split_inputs(X_test)).ravel()
-
-        # inverse‑scale
         scaler_y = self.out["scaler_y"]
-        y_test = scaler_y.inverse_transform(y_test_scaled.reshape(-1, 1)).ravel()
-        y_pred = scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).ravel()
+        n_num = self.out["n_numeric"]
+        stats = StreamingErrorStats(len(self.out["zip_lookup"]))
+
+        for start in range(0, len(X_test), batch_size):
+            X_b = X_test[start:start + batch_size]
+            y_pred_scaled = self.model.predict_on_batch(self._split_inputs(X_b))
+
+            # inverse‑scale
+            y_b = scaler_y.inverse_transform(
+                np.asarray(y_test_scaled[start:start + batch_size]).reshape(-1, 1))
+            y_pred = scaler_y.inverse_transform(np.asarray(y_pred_scaled).reshape(-1, 1))
+            stats.update(y_b, y_pred, X_b[:, -1, n_num])
+
+        metrics = stats.result()
+        self.per_zip_metrics = stats.per_zip(self.out["zip_lookup"])
+        logging.info("Test → RMSE $%.0f | MAE $%.0f | MAPE %.2f%%",
+                     metrics["rmse"], metrics["mae"], metrics["mape"])
+        return metrics
+
+    # ------------------------------------------------------------------
+    # Incremental retraining
+    # ------------------------------------------------------------------
+    @staticmethod
+    def latest_month(data_path: str | Path) -> pd.Timestamp:
+        """Most recent month column in a ZHVI file (reads the header only)."""
+        cols = pd.read_csv(data_path, nrows=0).columns
+        return max(pd.to_datetime(c) for c in cols if c.count("-") == 2)
 
-        rmse = mean_squared_error(y_test, y_pred, squared=False)
-        mae  = mean_absolute_error(y_test, y_pred)
-        mape = mean_absolute_percentage_error(y_test, y_pred) * 100
-        logging.info("Test → RMSE $%.0f | MAE $%.0f | MAPE %.2f%%", rmse, mae, mape)
-        return dict(rmse=rmse, mae=mae, mape=mape)
+    @staticmethod
+    def _write_replay(path: Path, X: np.ndarray, y: np.ndarray, size: int, seed: int = 0):
+        if len(X) > size:
+            keep = np.random.default_rng(seed).choice(len(X), size, replace=False)
+            X, y = X[keep], y[keep]
+        np.savez(path, X=X, y=y)
+
+    def save_checkpoint(self, ckpt_dir: str | Path = "checkpoints", replay_size: int = 50_000):
+        """Persist model + optimizer state, scalers and a replay sample."""
+        if self.model is None or self.out is None:
+            raise RuntimeError("Need a trained model")
+        ckpt = Path(ckpt_dir)
+        ckpt.mkdir(parents=True, exist_ok=True)
+
+        self.model.save(ckpt / "model.keras")
+        X_tr, y_tr = self.out["splits"]["train"]
+        X_va, y_va = self.out["splits"]["val"]
+        self._write_replay(ckpt / "replay.npz", np.concatenate([X_tr, X_va]),
+                           np.concatenate([y_tr, y_va]), replay_size)
+        self._write_meta(ckpt, self.out["last_date"])
+        logging.info("Checkpoint saved to %s (data up to %s)", ckpt, self.out["last_date"].date())
+
+    def _write_meta(self, ckpt: Path, last_date):
+        meta = {k: self.out[k] for k in ("lookback", "horizon", "n_numeric",
+                                         "scaler_X", "scaler_y", "zip_lookup")}
+        meta["last_date"] = pd.Timestamp(last_date)
+        tmp = ckpt / "meta.pkl.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(meta, f)
+        os.replace(tmp, ckpt / "meta.pkl")
+
+    @staticmethod
+    def _staged(path: Path) -> Path:
+        # keeps the suffix Keras / np.savez expect: model.keras → model.tmp.keras
+        return path.with_name(f"{path.stem}.tmp{path.suffix}")
+
+    def _finish_update(self, ckpt: Path) -> bool:
+        """Swap in the staged files of an update whose meta.pkl is committed."""
+        pending = ckpt / "pending.npz"
+        if not pending.exists():
+            return False
+        with np.load(pending) as p:
+            target = pd.Timestamp(p["last_date"].item())
+        with open(ckpt / "meta.pkl", "rb") as f:
+            if pickle.load(f)["last_date"] < target:
+                return False
+        for name in ("model.keras", "replay.npz"):
+            staged = self._staged(ckpt / name)
+            if staged.exists():
+                os.replace(staged, ckpt / name)
+        pending.unlink()
+        logging.info("Checkpoint updated through %s", target.date())
+        return True
+
+    def resume(self, ckpt_dir: str | Path = "checkpoints") -> Model:
+        """Load model (with optimizer state) and preprocessing meta from a checkpoint."""
+        ckpt = Path(ckpt_dir)
+        with open(ckpt / "meta.pkl", "rb") as f:
+            meta = pickle.load(f)
+        self.lookback = meta["lookback"]
+        self.out = meta
+        self.model = tf.keras.models.load_model(ckpt / "model.keras")
+        return self.model
+
+    def incremental_update(self, ckpt_dir: str | Path = "checkpoints", epochs=5, batch=64,
+                           replay_ratio: float = 1.0, replay_size: int = 50_000, seed: int = 0):
+        """Fine-tune the checkpointed model on months added since it was trained.
+
+        Only the new tail of the panel is feature-engineered.  The new windows
+        are mixed with `replay_ratio` × as many windows drawn from the replay
+        sample.  An interrupted update resumes from `pending.npz` and the
+        BackupAndRestore state on the next call.
+        """
+        ckpt = Path(ckpt_dir)
+        self._finish_update(ckpt)
+        self.resume(ckpt)
+        pending = ckpt / "pending.npz"
+
+        if pending.exists():
+            logging.info("Resuming interrupted update from %s", pending)
+            with np.load(pending) as p:
+                X_new, y_new, last_date = p["X"], p["y"], pd.Timestamp(p["last_date"].item())
+        else:
+            latest = self.latest_month(self.data_path)
+            if latest <= self.out["last_date"]:
+                logging.info("No new months since %s", self.out["last_date"].date())
+                return None
+            prep = MultiZipPreprocessor(self.data_path, lookback=self.lookback)
+            prep.horizon = self.out["horizon"]
+            inc = prep.run_incremental(self.out["last_date"], self.out["scaler_X"],
+                                       self.out["scaler_y"], self.out["zip_lookup"])
+            X_new, y_new = inc["recent"]
+            last_date = inc["last_date"]
+            np.savez(self._staged(pending), X=X_new, y=y_new, last_date=np.array(str(last_date.date())))
+            os.replace(self._staged(pending), pending)
+
+        with np.load(ckpt / "replay.npz") as r:
+            X_old, y_old = r["X"], r["y"]
+        rng = np.random.default_rng(seed)
+        n_replay = min(len(X_old), int(replay_ratio * len(X_new)))
+        pick = rng.choice(len(X_old), n_replay, replace=False)
+        X_fit = np.concatenate([X_new, X_old[pick]])
+        y_fit = np.concatenate([y_new, y_old[pick]])
+        logging.info("Fine-tuning on %d new + %d replay windows", len(X_new), n_replay)
+
+        self.history = self.model.fit(
+            self._split_inputs(X_fit),
+            y_fit,
+            epochs=epochs,
+            batch_size=batch,
+            shuffle=True,
+            verbose=1,
+            callbacks=[BackupAndRestore(str(ckpt / "backup"))],
+        )
+
+        # stage, commit through meta.pkl's last_date, then swap the staged files in
+        self.model.save(self._staged(ckpt / "model.keras"))
+        self._write_replay(self._staged(ckpt / "replay.npz"), np.concatenate([X_old, X_new]),
+                           np.concatenate([y_old, y_new]), replay_size, seed)
+        self._write_meta(ckpt, last_date)
+        self._finish_update(ckpt)
+        return self.history
 
 
 if __name__ == "__main__":
+    import sys
+
     trainer = GlobalLSTMTrainer(
         "Datasets_HOME_VALUES/Zip_zhvi_bdrmcnt_3_uc_sfrcondo_tier_0.33_0.67_sm_sa_month.csv",
         lookback=24,
     )
-    trainer.preprocess()
-    trainer.build_model()
-    trainer.train(epochs=30)
-    trainer.evaluate()
+    if "--incremental" in sys.argv:
+        trainer.incremental_update("checkpoints", epochs=5)
+    else:
+        trainer.preprocess()
+        trainer.build_model()
+        trainer.train(epochs=30)
+        trainer.evaluate()
+        trainer.save_checkpoint("checkpoints")
@@ -0,0 +1,122 @@
+"""Batched recursive multi-step forecaster for the global LSTM.
+
+Rolls the model forward month by month for many ZIPs at once:
+1. The last `lookback` feature rows of every ZIP are scaled once and kept
+   in a preallocated ring buffer (written twice, so the current window is
+   always a contiguous view – no copies, no `pd.concat`).
+2. Each step only the *new* row's features are computed from a small ring
+   of the last 12 prices (lags, rolling mean, pct change, month terms).
+3. One `model.predict` per step covers every ZIP in the batch.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+from lstm_simple_preprocessing import NUM_COLS, MultiZipPreprocessor
+
+PRICE_HIST = 12   # longest lag used by the features
+
+
+class RecursiveForecaster:
+    """Forecast arbitrary-length monthly paths for a batch of ZIPs."""
+
+    def __init__(self, prep: MultiZipPreprocessor, out: dict, model, batch_size: int = 1024):
+        self.prep = prep
+        self.out = out
+        self.model = model
+        self.batch_size = batch_size
+        self.lookback = out["lookback"]
+
+    # ------------------------------------------------------------------
+    # 1. Seed buffers from the panel
+    # ------------------------------------------------------------------
+    def _init_state(self, zip_codes: np.ndarray):
+        L, F = self.lookback, len(NUM_COLS)
+        long = self.prep.long
+        sub = long[long.RegionName.isin(zip_codes)]
+
+        counts = sub.groupby("RegionName").size().reindex(zip_codes)
+        short = counts[~(counts >= L)]
+        if len(short):
+            raise ValueError(f"ZIPs with fewer than {L} rows: {list(short.index)}")
+
+        # `long` is sorted by (RegionName, date); reorder to match zip_codes
+        tail = sub.groupby("RegionName", sort=False).tail(L)
+        order = {z: i for i, z in enumerate(tail["RegionName"].values[::L])}
+        idx = np.array([order[z] for z in zip_codes])
+
+        feats = tail[NUM_COLS].values.astype(float)
+        feats = self.out["scaler_X"].transform(feats).reshape(-1, L, F)[idx]
+        prices = tail["price"].values.reshape(-1, L)[idx, -PRICE_HIST:]
+        months = tail["date"].dt.month.values.reshape(-1, L)[idx, -1]
+
+        n = len(zip_codes)
+        # double-length rings: slot k is mirrored at k + size
+        self._feat = np.empty((n, 2 * L, F))
+        self._feat[:, :L] = feats
+        self._feat[:, L:] = feats
+        self._price = np.empty((n, 2 * PRICE_HIST))
+        self._price[:, :PRICE_HIST] = prices
+        self._price[:, PRICE_HIST:] = prices
+        self._head = 0          # start of the current window
+        self._phead = 0         # oldest price in the price ring
+        self._month = months.astype(int)
+
+        zids = np.array([self.out["zip_lookup"][z] for z in zip_codes], dtype="int32")
+        self._zid = np.repeat(zids[:, None], L, axis=1)
+
+    # ------------------------------------------------------------------
+    # 2. Incremental update
+    # ------------------------------------------------------------------
+    def _window(self) -> np.ndarray:
+        return self._feat[:, self._head:self._head + self.lookback]
+
+    def _prices(self) -> np.ndarray:
+        """Last 12 prices, oldest first (column -1 = most recent)."""
+        return self._price[:, self._phead:self._phead + PRICE_HIST]
+
+    def _next_row(self) -> np.ndarray:
+        p = self._prices()
+        self._month = self._month % 12 + 1
+        row = np.column_stack([
+            p[:, -1], p[:, -2], p[:, -3], p[:, -12],
+            p[:, -6:].mean(axis=1),
+            p[:, -1] / p[:, -2] - 1,
+            np.sin(2 * np.pi * self._month / 12),
+            np.cos(2 * np.pi * self._month / 12),
+        ])
+        return self.out["scaler_X"].transform(row)
+
+    def _push(self, row: np.ndarray, price: np.ndarray):
+        L = self.lookback
+        # the new row's features only see prices up to the previous month
+        self._feat[:, self._head] = row
+        self._feat[:, self._head + L] = row
+        self._head = (self._head + 1) % L
+
+        self._price[:, self._phead] = price
+        self._price[:, self._phead + PRICE_HIST] = price
+        self._phead = (self._phead + 1) % PRICE_HIST
+
+    # ------------------------------------------------------------------
+    # 3. public driver
+    # ------------------------------------------------------------------
+    def forecast(self, zip_codes: Iterable[int], steps: int = 12) -> np.ndarray:
+        """
+        Return real-dollar forecasts of shape ``(len(zip_codes), steps)``.
+        """
+        zip_codes = np.asarray(list(zip_codes))
+        self._init_state(zip_codes)
+        scaler_y = self.out["scaler_y"]
+        preds = np.empty((len(zip_codes), steps))
+
+        for t in range(steps):
+            y_scaled = self.model.predict([self._window(), self._zid],
+                                          batch_size=self.batch_size, verbose=0).ravel()
+            y_real = scaler_y.inverse_transform(y_scaled.reshape(-1, 1)).ravel()
+            preds[:, t] = y_real
+            self._push(self._next_row(), y_real)
+
+        return preds
@@ -0,0 +1,69 @@
+"""Streaming error accumulators for batched evaluation.
+
+`StreamingErrorStats.update` is fed one prediction batch at a time and only
+keeps running sums (globally and per ZIP id via `np.bincount`), so memory
+stays constant no matter how many test windows are scored.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+_EPS = np.finfo(np.float64).eps    # same zero guard as sklearn's MAPE
+
+
+class StreamingErrorStats:
+    """Running RMSE / MAE / MAPE, overall and per ZIP id."""
+
+    def __init__(self, n_zip: int):
+        self.n = 0
+        self.se = self.ae = self.ape = 0.0
+        self.zip_n = np.zeros(n_zip, dtype=np.int64)
+        self.zip_se = np.zeros(n_zip)
+        self.zip_ae = np.zeros(n_zip)
+        self.zip_ape = np.zeros(n_zip)
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray, zip_ids: np.ndarray):
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        err = np.asarray(y_pred, dtype=np.float64).ravel() - y_true
+        se, ae = err ** 2, np.abs(err)
+        ape = ae / np.maximum(np.abs(y_true), _EPS)
+
+        self.n += len(err)
+        self.se += se.sum()
+        self.ae += ae.sum()
+        self.ape += ape.sum()
+
+        m = len(self.zip_n)
+        zip_ids = np.asarray(zip_ids, dtype=np.int64).ravel()
+        self.zip_n += np.bincount(zip_ids, minlength=m)
+        self.zip_se += np.bincount(zip_ids, weights=se, minlength=m)
+        self.zip_ae += np.bincount(zip_ids, weights=ae, minlength=m)
+        self.zip_ape += np.bincount(zip_ids, weights=ape, minlength=m)
+
+    def result(self) -> Dict[str, float]:
+        if self.n == 0:
+            raise ValueError("No samples accumulated")
+        return dict(
+            rmse=float(np.sqrt(self.se / self.n)),
+            mae=float(self.ae / self.n),
+            mape=float(self.ape / self.n * 100),
+        )
+
+    def per_zip(self, zip_lookup: Dict | None = None) -> pd.DataFrame:
+        """Per-ZIP metrics; `zip_lookup` (ZIP → id) maps ids back to ZIP codes."""
+        seen = np.flatnonzero(self.zip_n)
+        n = self.zip_n[seen]
+        table = pd.DataFrame({
+            "zip_id": seen,
+            "n": n,
+            "rmse": np.sqrt(self.zip_se[seen] / n),
+            "mae": self.zip_ae[seen] / n,
+            "mape": self.zip_ape[seen] / n * 100,
+        })
+        if zip_lookup is not None:
+            inv = {i: z for z, i in zip_lookup.items()}
+            table.insert(0, "zip_code", table["zip_id"].map(inv))
+        return table
@@ -0,0 +1,165 @@
+"""
+crawl_state.py
+––––––––––––––
+Resumable crawl state for scraper.py and scraper_rental.py.
+
+A SQLite file keeps, per scraper ("sale" / "rental") and category
+(city/property type), the URL frontier, each URL's fetch status, the
+content hash and JSON of its last record, and when it was last seen on a
+listing page / last fetched. Records are written
+as soon as they are scraped, so after a crash the next run picks up where
+the last one stopped:
+
+  • a category whose frontier was seen recently skips the listing page,
+  • fresh, successfully fetched URLs are not fetched again,
+  • stale ones (older than SCRAPE_STALE_HOURS) are re-fetched and their
+    content hash tells whether the listing actually changed.
+
+    SCRAPE_STATE_DB=crawl_state.sqlite   SCRAPE_STALE_HOURS=24
+    python crawl_state.py                # per-scraper/category status summary
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+STATE_DB = os.getenv("SCRAPE_STATE_DB", "crawl_state.sqlite")
+STALE_AFTER = float(os.getenv("SCRAPE_STALE_HOURS", 24)) * 3600
+RECORDS_CHUNK = 500
+
+# rows are keyed by (scraper, url) so both scrapers can share one file
+# without relabelling each other's URLs (the old url-keyed `urls` table is
+# left unused; its listings are simply fetched again)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_urls (
+    scraper      TEXT NOT NULL,
+    url          TEXT NOT NULL,
+    category     TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'pending',   -- pending | done | failed
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    content_hash TEXT,
+    record       TEXT,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    last_fetched REAL,
+    last_changed REAL,
+    PRIMARY KEY (scraper, url)
+);
+CREATE INDEX IF NOT EXISTS crawl_urls_category ON crawl_urls (scraper, category, last_seen);
+"""
+
+
+def content_hash(record):
+    return hashlib.sha256(json.dumps(record, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _chunks(urls, size=RECORDS_CHUNK):
+    # keeps IN (...) lists under SQLite's bound-variable limit
+    for start in range(0, len(urls), size):
+        yield urls[start:start + size]
+
+
+class CrawlState:
+    def __init__(self, scraper, path=STATE_DB, stale_after=STALE_AFTER):
+        self.scraper = scraper
+        self.path = path
+        self.stale_after = stale_after
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.stats = {"fetched": 0, "changed": 0, "unchanged": 0, "failed": 0, "skipped": 0}
+
+    # ---------- frontier --------------------------------------------------
+    def frontier(self, category, limit):
+        """URLs seen on the category's listing page within the stale window."""
+        rows = self.conn.execute(
+            "SELECT url FROM crawl_urls WHERE scraper = ? AND category = ? AND last_seen >= ? "
+            "ORDER BY url LIMIT ?",
+            (self.scraper, category, time.time() - self.stale_after, limit),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def add_urls(self, category, urls):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO crawl_urls (scraper, url, category, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(scraper, url) DO UPDATE SET last_seen = excluded.last_seen, category = excluded.category",
+                [(self.scraper, url, category, now, now) for url in urls],
+            )
+
+    def due(self, urls):
+        """The subset of `urls` that is new, failed or stale, in order."""
+        cutoff = time.time() - self.stale_after
+        fresh = set()
+        for batch in _chunks(urls):
+            marks = ",".join("?" * len(batch))
+            fresh.update(r[0] for r in self.conn.execute(
+                f"SELECT url FROM crawl_urls WHERE scraper = ? AND url IN ({marks}) "
+                "AND status = 'done' AND last_fetched >= ?",
+                (self.scraper, *batch, cutoff),
+            ))
+        self.stats["skipped"] += len(fresh)
+        return [url for url in urls if url not in fresh]
+
+    # ---------- results ---------------------------------------------------
+    def record(self, url, record):
+        """Store a fetch result (None = failed). Returns True if the content changed."""
+        now = time.time()
+        with self.conn:
+            if record is None:
+                self.stats["failed"] += 1
+                self.conn.execute(
+                    "UPDATE crawl_urls SET status = 'failed', attempts = attempts + 1, last_fetched = ? "
+                    "WHERE scraper = ? AND url = ?",
+                    (now, self.scraper, url),
+                )
+                return False
+            digest = content_hash(record)
+            row = self.conn.execute("SELECT content_hash FROM crawl_urls WHERE scraper = ? AND url = ?",
+                                    (self.scraper, url)).fetchone()
+            changed = row is None or row[0] != digest
+            self.stats["fetched"] += 1
+            self.stats["changed" if changed else "unchanged"] += 1
+            self.conn.execute(
+                "UPDATE crawl_urls SET status = 'done', attempts = attempts + 1, content_hash = ?, record = ?, "
+                "last_fetched = ?, last_changed = CASE WHEN ? THEN ? ELSE last_changed END "
+                "WHERE scraper = ? AND url = ?",
+                (digest, json.dumps(record, ensure_ascii=False), now, changed, now, self.scraper, url),
+            )
+            return changed
+
+    def records(self, urls, chunk=RECORDS_CHUNK):
+        """Yield stored records for `urls` (successful fetches only), in order."""
+        for batch in _chunks(urls, chunk):
+            marks = ",".join("?" * len(batch))
+            stored = dict(self.conn.execute(
+                f"SELECT url, record FROM crawl_urls WHERE scraper = ? AND url IN ({marks}) "
+                "AND record IS NOT NULL",
+                (self.scraper, *batch),
+            ).fetchall())
+            for url in batch:
+                if url in stored:
+                    yield json.loads(stored[url])
+
+    def summary(self):
+        s = self.stats
+        return (f"Crawl state: {s['fetched']} fetched ({s['changed']} changed, {s['unchanged']} unchanged), "
+                f"{s['skipped']} fresh skipped, {s['failed']} failed")
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(STATE_DB)
+    conn.executescript(_SCHEMA)
+    rows = conn.execute(
+        "SELECT scraper, category, status, COUNT(*), SUM(last_fetched >= ?) FROM crawl_urls "
+        "GROUP BY scraper, category, status ORDER BY scraper, category",
+        (time.time() - STALE_AFTER,),
+    ).fetchall()
+    for scraper, category, status, n, fresh in rows:
+        print(f"{scraper:<8} {category:<32} {status:<8} {n:>5}  ({fresh or 0} fresh)")
@@ -0,0 +1,146 @@
+"""
+extraction.py
+–––––––––––––
+Single-round-trip DOM extraction for listing detail pages.
+
+Every field, every description candidate and every image URL is read by one
+`page.evaluate` call, so a missing selector costs nothing instead of a
+browser round trip plus a locator timeout. Selector priorities live in
+DETAIL_CONFIG below; earlier entries win.
+"""
+
+import re
+import time
+
+DETAIL_CONFIG = {
+    # field → selectors tried in order; the first non-empty innerText wins
+    "fields": {
+        "address": ["h1"],
+        "price": ["[data-testid='listingPriceModal']"],
+        "beds": ["[data-testid='listingBedIcon']"],
+        "baths": ["[data-testid='listingBathIcon']"],
+        "sqft": ["[data-testid='listingDimensionsIcon']"],
+        "garage": ["[data-testid='listingCarIcon']"],
+    },
+    # preferred description block; its line breaks are kept
+    "description_section": "[data-testid='listingDescriptionTab'] div > div[data-testid='detailsTable'] > section > div > section",
+    # fallbacks, whitespace-collapsed
+    "description": [
+        "[data-testid='listingDescriptionTab'] p",
+        "[data-testid='listingDescriptionTab'] div",
+        "[data-testid='listingDescriptionTab'] span",
+        "[data-testid='listingDescriptionTab']",
+        "[data-testid='listingDescriptionTab'] *",
+        "[data-testid='propertyDescription']",
+        "[data-testid='listingDescription']",
+        ".property-description",
+        ".listing-description",
+        "[data-testid='description']",
+        ".description",
+        "p[data-testid*='description']",
+        "div[data-testid*='description']",
+        "[data-testid='detailsTable'] p",
+        "[data-testid='detailsTable'] div",
+        "[data-testid='detailsTable']",
+    ],
+    "min_description_len": 20,
+    # gallery selectors; the first one whose first <img> has an http src is the cover
+    "images": [
+        ".swiperCarouselComponent img",
+        ".swiper-wrapper img",
+        ".swiper-slide img",
+        "[data-testid*='carousel'] img",
+        "[data-testid*='gallery'] img",
+        ".carousel img",
+        ".gallery img",
+        ".image-gallery img",
+        ".property-images img",
+        ".listing-images img",
+        "img[src*='zoocasa']",
+        "img[alt*='property']",
+        "img[alt*='listing']",
+    ],
+}
+
+EXTRACT_JS = """
+(cfg) => {
+  const clean = (t) => (t || "").replace(/\\s+/g, " ").trim();
+  const first = (sel) => { try { return document.querySelector(sel); } catch (e) { return null; } };
+  const all = (sel) => { try { return Array.from(document.querySelectorAll(sel)); } catch (e) { return []; } };
+
+  const fields = {};
+  for (const [name, sels] of Object.entries(cfg.fields)) {
+    fields[name] = "";
+    for (const sel of sels) {
+      const el = first(sel);
+      const text = el ? clean(el.innerText) : "";
+      if (text) { fields[name] = text; break; }
+    }
+  }
+
+  const section = first(cfg.description_section);
+  const description_section = section ? (section.innerText || "").trim() : "";
+
+  const description_candidates = [];
+  for (const sel of cfg.description) {
+    const el = first(sel);
+    const text = el ? clean(el.innerText) : "";
+    if (text.length > cfg.min_description_len) description_candidates.push([sel, text]);
+  }
+
+  let cover = "";
+  const images = [];
+  for (const sel of cfg.images) {
+    const imgs = all(sel);
+    if (!imgs.length) continue;
+    const src = imgs[0].getAttribute("src") || "";
+    if (!cover && src.startsWith("http")) cover = src;
+    for (const img of imgs) {
+      const s = img.getAttribute("src") || "";
+      if (s.startsWith("http") && !images.includes(s)) images.push(s);
+    }
+  }
+
+  return {fields, description_section, description_candidates, cover, images};
+}
+"""
+
+_digits = re.compile(r"\d+")
+
+
+def _first_number(text):
+    m = _digits.search(text) if text else None
+    return m.group(0) if m else ""
+
+
+async def extract_detail(page, config=DETAIL_CONFIG):
+    """
+    Read one detail page in a single round trip. Returns a dict with
+    address, price, beds, baths, sqft, garage, description, image_url and
+    image_urls (all gallery images, cover first).
+    """
+    t0 = time.perf_counter()
+    raw = await page.evaluate(EXTRACT_JS, config)
+    fields = raw["fields"]
+
+    description = raw["description_section"]
+    if len(description) <= config["min_description_len"]:
+        description = raw["description_candidates"][0][1] if raw["description_candidates"] else ""
+
+    images = raw["images"]
+    if raw["cover"]:
+        images = [raw["cover"]] + [src for src in images if src != raw["cover"]]
+
+    out = {
+        "address": fields["address"] or "Unknown",
+        "price": fields["price"] or "No price",
+        "beds": _first_number(fields["beds"]),
+        "baths": _first_number(fields["baths"]),
+        "sqft": _first_number(fields["sqft"]),
+        "garage": _first_number(fields["garage"]),
+        "description": description,
+        "image_url": raw["cover"],
+        "image_urls": images,
+    }
+    print(f"    Extracted in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return out
@@ -0,0 +1,369 @@
+"""
+http_fastpath.py
+––––––––––––––––
+HTTP-first fast path for listing detail pages.
+
+Detail pages ship their data as embedded JSON (Next.js __NEXT_DATA__,
+schema.org ld+json, or a `window.__STATE__ = {...}` hydration blob). A
+pooled aiohttp session GETs the page and parse_listing_html() maps the
+embedded listing onto the same fields extract_detail() returns, so
+scrape_listing only renders in Playwright when parsing fails. Pages also
+embed similar / nearby listings, so only a listing whose URL, id or street
+address matches the requested URL's slug is accepted.
+
+    SCRAPE_HTTP_FIRST=0      # always render in Playwright
+
+Check the parser against the saved detail pages in fixtures/ (served
+locally over HTTP). Each <slug>.html is compared with <slug>.json, the
+fields the rendered extractor read from that page; --render re-renders the
+pages with Playwright and compares against extract_detail() directly:
+
+    python http_fastpath.py                        # fixtures/
+    python http_fastpath.py fixtures/ --render
+"""
+
+import asyncio
+import http.server
+import json
+import os
+import re
+import statistics
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+HTTP_FIRST = os.getenv("SCRAPE_HTTP_FIRST", "1") != "0"
+HTTP_TIMEOUT = 10
+POOL_SIZE = int(os.getenv("SCRAPE_HTTP_POOL", 16))
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# field → candidate keys in the embedded listing object, in priority order
+FIELD_KEYS = {
+    "address": ("address", "fullAddress", "streetAddress", "addressLine"),
+    "price": ("price", "listPrice", "listingPrice", "priceValue", "rent"),
+    "beds": ("bedrooms", "beds", "bedroomsTotal", "numberOfBedrooms"),
+    "baths": ("bathrooms", "baths", "bathroomsTotal", "numberOfBathroomsTotal"),
+    "sqft": ("sqft", "squareFootage", "livingArea", "floorSize", "size"),
+    "garage": ("garage", "garageSpaces", "parkingSpaces", "parking"),
+    "description": ("description", "publicRemarks", "remarks"),
+    "images": ("images", "photos", "imageUrls", "image", "photo"),
+}
+MIN_DESCRIPTION_LEN = 20
+# keys that identify which listing an embedded dict describes
+URL_KEYS = ("url", "@id", "canonicalUrl", "href", "path", "slug")
+ID_KEYS = ("id", "listingId", "listing_id", "mlsNumber", "mls", "listingKey")
+MIN_ID_LEN = 4
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_NEXT_DATA = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+_LD_JSON = re.compile(r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+_STATE = re.compile(r'window\.__[A-Z_]+__\s*=\s*')
+_digits = re.compile(r"\d+")
+
+
+# ---------- parsing ----------------------------------------------------------
+def _embedded_json(html):
+    """Yield every JSON document embedded in `html`."""
+    for pattern in (_NEXT_DATA, _LD_JSON):
+        for m in pattern.finditer(html):
+            try:
+                yield json.loads(m.group(1))
+            except ValueError:
+                continue
+    decoder = json.JSONDecoder()
+    for m in _STATE.finditer(html):
+        try:
+            yield decoder.raw_decode(html, m.end())[0]
+        except ValueError:
+            continue
+
+
+def _walk(obj):
+    if isinstance(obj, dict):
+        yield obj
+        for v in obj.values():
+            yield from _walk(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _walk(v)
+
+
+def _lookup(d, field):
+    for key in FIELD_KEYS[field]:
+        if d.get(key) not in (None, "", [], {}):
+            return d[key]
+    return None
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+
+
+def url_slug(url):
+    """Last path segment of a listing URL, slugified (extension dropped)."""
+    segment = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return _slug(os.path.splitext(segment)[0])
+
+
+def _belongs_to(d, slug):
+    """True if the embedded listing `d` is the one the URL slug names."""
+    padded = f"-{slug}-"
+    for key in URL_KEYS:
+        if isinstance(d.get(key), str) and _slug(urlsplit(d[key]).path).endswith(slug):
+            return True
+    for key in ID_KEYS:
+        ident = _slug(d.get(key) or "")
+        if len(ident) >= MIN_ID_LEN and f"-{ident}-" in padded:
+            return True
+    street = _format_address(_lookup(d, "address")).split(",")[0]
+    return bool(_slug(street)) and padded.startswith(f"-{_slug(street)}-")
+
+
+def _find_listing(docs, slug=None):
+    """
+    The dict that carries the most listing fields (must have address +
+    price) and, when `slug` is given, belongs to that URL.
+    """
+    best, best_score = None, 0
+    for doc in docs:
+        for d in _walk(doc):
+            if _lookup(d, "address") is None or _lookup(_offer(d), "price") is None:
+                continue
+            if slug and not _belongs_to(d, slug):
+                continue
+            score = sum(_lookup(d, f) is not None for f in FIELD_KEYS)
+            if score > best_score:
+                best, best_score = d, score
+    return best
+
+
+def _offer(d):
+    # schema.org puts the price under "offers"
+    offers = d.get("offers")
+    if isinstance(offers, list) and offers:
+        offers = offers[0]
+    return {**offers, **d} if isinstance(offers, dict) else d
+
+
+def _format_address(value):
+    if isinstance(value, dict):
+        # "street, city, ST 12345", like the rendered h1, so the ZIP is parsed from it
+        region = " ".join(str(value[k]).strip() for k in ("addressRegion", "postalCode") if value.get(k))
+        parts = [value.get("streetAddress"), value.get("addressLocality"), region]
+        return ", ".join(str(p).strip() for p in parts if p)
+    return re.sub(r"\s+", " ", str(value)).strip()
+
+
+def _format_price(value):
+    if isinstance(value, dict):
+        value = value.get("value") or value.get("amount")
+    if isinstance(value, (int, float)):
+        return f"${value:,.0f}"
+    return re.sub(r"\s+", " ", str(value)).strip() if value else ""
+
+
+def _first_number(value):
+    if isinstance(value, dict):
+        value = value.get("value")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    m = _digits.search(str(value).replace(",", "")) if value not in (None, "") else None
+    return m.group(0) if m else ""
+
+
+def _image_urls(value):
+    items = value if isinstance(value, list) else [value]
+    urls = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("url") or item.get("src") or item.get("contentUrl")
+        if isinstance(item, str) and item.startswith("http") and item not in urls:
+            urls.append(item)
+    return urls
+
+
+def parse_listing_html(html, url=None):
+    """
+    Parse the embedded listing JSON in a detail page. Returns the same keys
+    as extraction.extract_detail, or None if no usable listing for `url` is
+    embedded (any listing when `url` is None).
+    """
+    listing = _find_listing(_embedded_json(html), url_slug(url) if url else None)
+    if listing is None:
+        return None
+    address = _format_address(_lookup(listing, "address"))
+    price = _format_price(_lookup(_offer(listing), "price"))
+    if not address or not price:
+        return None
+    description = _lookup(listing, "description")
+    description = description.strip() if isinstance(description, str) else ""
+    images = _image_urls(_lookup(listing, "images"))
+    return {
+        "address": address,
+        "price": price,
+        "beds": _first_number(_lookup(listing, "beds")),
+        "baths": _first_number(_lookup(listing, "baths")),
+        "sqft": _first_number(_lookup(listing, "sqft")),
+        "garage": _first_number(_lookup(listing, "garage")),
+        "description": description if len(description) > MIN_DESCRIPTION_LEN else "",
+        "image_url": images[0] if images else "",
+        "image_urls": images,
+    }
+
+
+# ---------- fetching ---------------------------------------------------------
+class HttpFastPath:
+    """Pooled GET + parse with hit-rate and latency tracking."""
+
+    def __init__(self, pool_size=POOL_SIZE, timeout=HTTP_TIMEOUT, enabled=HTTP_FIRST):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.enabled = enabled
+        self._session = None
+        self.attempts = 0
+        self.hits = 0
+        self.errors = 0
+        self.latencies_ms = []
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=HEADERS,
+            )
+        return self._session
+
+    async def fetch(self, url):
+        """Listing fields for `url`, or None to fall back to the browser."""
+        if not self.enabled:
+            return None
+        self.attempts += 1
+        t0 = time.perf_counter()
+        try:
+            session = await self._get_session()
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+                html = await resp.text()
+            data = parse_listing_html(html, url)
+        except Exception as e:
+            # network, decoding or parsing trouble: count it and let Playwright render
+            self.errors += 1
+            print(f"    HTTP fast path failed ({type(e).__name__}: {e}), rendering instead")
+            data = None
+        self.latencies_ms.append((time.perf_counter() - t0) * 1000)
+        if data is not None:
+            self.hits += 1
+        return data
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    def summary(self):
+        if not self.attempts:
+            return "HTTP fast path: not used"
+        lat = sorted(self.latencies_ms)
+        p95 = lat[min(len(lat) - 1, int(0.95 * len(lat)))]
+        return (f"HTTP fast path: {self.hits}/{self.attempts} hits ({self.hits / self.attempts:.0%}), "
+                f"{self.errors} errors, latency p50={statistics.median(lat):.0f} ms p95={p95:.0f} ms")
+
+
+FASTPATH = HttpFastPath()
+
+
+# ---------- fixture check ----------------------------------------------------
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+COMPARED_FIELDS = ("address", "price", "beds", "baths", "sqft", "garage", "description", "image_url")
+
+
+def _mismatches(fast, rendered):
+    norm = lambda v: re.sub(r"\s+", " ", str(v or "")).strip()
+    return [f for f in COMPARED_FIELDS if norm(fast.get(f)) != norm(rendered.get(f))]
+
+
+async def _render_fixture(browser, url):
+    from extraction import extract_detail
+    from waits import wait_for_detail
+
+    page = await browser.new_page()
+    try:
+        await page.goto(url)
+        await wait_for_detail(page)
+        return await extract_detail(page)
+    finally:
+        await page.close()
+
+
+async def _check_fixtures(folder=FIXTURES_DIR, render=False):
+    """
+    Fast path vs. rendered extractor on every <slug>.html in `folder`.
+    Declining (None → render) is always safe; returning different fields
+    is a failure. Returns the number of failures.
+    """
+    import functools
+    import threading
+
+    handler = functools.partial(_QuietHandler, directory=folder)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    browser = playwright = None
+    if render:
+        from playwright.async_api import async_playwright
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch()
+
+    fast = HttpFastPath(enabled=True)
+    failures = 0
+    try:
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(".html"):
+                continue
+            url = f"{base}/{name}"
+            if render:
+                rendered = await _render_fixture(browser, url)
+            else:
+                with open(os.path.join(folder, name[:-len(".html")] + ".json"), encoding="utf-8") as f:
+                    rendered = json.load(f)
+            data = await fast.fetch(url)
+            if data is None:
+                print(f"↪ {name}: no matching embedded listing, rendered instead")
+                continue
+            bad = _mismatches(data, rendered)
+            if bad:
+                failures += 1
+                print(f"✗ {name}: " + "; ".join(f"{f} {data.get(f)!r} ≠ rendered {rendered.get(f)!r}" for f in bad))
+            else:
+                print(f"✓ {name}: {data['address']} - {data['price']} "
+                      f"({data['beds']} bd / {data['baths']} ba / {data['sqft']} sqft, {len(data['image_urls'])} images)")
+    finally:
+        await fast.close()
+        server.shutdown()
+        if browser is not None:
+            await browser.close()
+            await playwright.stop()
+    print(fast.summary())
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    p = argparse.ArgumentParser(description="Check the HTTP fast path against saved detail pages")
+    p.add_argument("folder", nargs="?", default=FIXTURES_DIR)
+    p.add_argument("--render", action="store_true", help="compare with a Playwright render instead of <slug>.json")
+    args = p.parse_args()
+    sys.exit(1 if asyncio.run(_check_fixtures(args.folder, args.render)) else 0)
@@ -0,0 +1,218 @@
+"""
+image_pipeline.py
+–––––––––––––––––
+Listing images, processed off the scrape path.
+
+scrape_listing only submits (address, image URL); background workers
+download through a pooled aiohttp session, hash the bytes (identical photos
+are stored and resized once), and a process pool renders each unique image
+to several widths as JPEG + WebP under public/images/v/<hash>/. Variants
+are never upscaled.
+
+public/images/manifest.json maps the frontend's image filename (see
+getImageFilename in src/lib/data.ts) to the variants plus a small `card`
+image for listing cards and a larger `full` one for the detail page:
+
+    {"100_Avocet_Way_San_Francisco_CA.jpg": {
+        "hash": "…", "width": 1600, "height": 1067,
+        "variants": [{"width": 320, "height": 213, "jpg": "/images/v/…/w320.jpg", "webp": "…"}, …],
+        "card": "/images/v/…/w640.webp", "full": "/images/v/…/w1280.webp"}}
+
+Backfill the manifest from images already in public/images:
+
+    python image_pipeline.py --backfill
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'public', 'images')
+WIDTHS = (320, 640, 1280)
+CARD_WIDTH = 640
+FULL_WIDTH = 1280
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_CONCURRENCY", 8))
+RESIZE_PROCESSES = int(os.getenv("IMAGE_PROCESSES", os.cpu_count() or 2))
+DOWNLOAD_TIMEOUT = 20
+
+
+def image_key(address):
+    """Same filename the frontend derives from an address (getImageFilename)."""
+    return re.sub(r"\s+", "_", re.sub(r"[,.]", "", address)) + ".jpg"
+
+
+def render_variants(data, out_dir, url_prefix, widths=WIDTHS):
+    """Resize `data` to each width as JPEG + WebP. Runs in a worker process."""
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert("RGB")
+    os.makedirs(out_dir, exist_ok=True)
+    variants = []
+    for width in sorted({min(w, img.width) for w in widths}):
+        height = round(img.height * width / img.width)
+        resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        resized.save(os.path.join(out_dir, f"w{width}.jpg"), "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        resized.save(os.path.join(out_dir, f"w{width}.webp"), "WEBP", quality=WEBP_QUALITY, method=4)
+        variants.append({
+            "width": width, "height": height,
+            "jpg": f"{url_prefix}/w{width}.jpg", "webp": f"{url_prefix}/w{width}.webp",
+        })
+    return {"width": img.width, "height": img.height, "variants": variants}
+
+
+def _pick(variants, width):
+    # smallest variant at least `width` wide, else the largest
+    for v in variants:
+        if v["width"] >= width:
+            return v["webp"]
+    return variants[-1]["webp"]
+
+
+class ImagePipeline:
+    def __init__(self, images_dir=IMAGES_DIR, widths=WIDTHS, concurrency=DOWNLOAD_CONCURRENCY,
+                 processes=RESIZE_PROCESSES):
+        self.images_dir = images_dir
+        self.widths = widths
+        self.concurrency = concurrency
+        self.processes = processes
+        self.manifest_path = os.path.join(images_dir, "manifest.json")
+        self.queue = asyncio.Queue()
+        self.manifest = {}
+        self.by_hash = {}
+        self.stats = {"downloaded": 0, "deduped": 0, "rendered": 0, "failed": 0, "orig_bytes": 0, "card_bytes": 0}
+        self._rendering = {}
+        self._workers = []
+        self._session = None
+        self._pool = None
+
+    # ---------- lifecycle -------------------------------------------------
+    def start(self):
+        """Load the existing manifest and start the download workers (inside the event loop)."""
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.by_hash = {entry["hash"]: entry for entry in self.manifest.values()}
+        self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT),
+        )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        """Finish queued images, then write the manifest."""
+        await self.queue.join()
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+        self.save_manifest()
+
+    def save_manifest(self):
+        os.makedirs(self.images_dir, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    # ---------- work ------------------------------------------------------
+    def submit(self, address, url):
+        """Queue the listing's image; never blocks the scraper."""
+        if url and url.startswith("http"):
+            self.queue.put_nowait((image_key(address), url))
+
+    async def _worker(self):
+        while True:
+            key, source = await self.queue.get()
+            try:
+                if isinstance(source, bytes):
+                    data = source
+                else:
+                    async with self._session.get(source) as resp:
+                        resp.raise_for_status()
+                        data = await resp.read()
+                    self.stats["downloaded"] += 1
+                await self._add(key, data)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"      ✗ Image failed for {key}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _add(self, key, data):
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        entry = self.by_hash.get(digest)
+        if entry is not None:
+            self.stats["deduped"] += 1
+        else:
+            # identical bytes arriving concurrently share one render
+            task = self._rendering.get(digest)
+            if task is None:
+                task = self._rendering[digest] = asyncio.ensure_future(self._render(digest, data))
+            else:
+                self.stats["deduped"] += 1
+            entry = await task
+        self.manifest[key] = entry
+
+    async def _render(self, digest, data):
+        out_dir = os.path.join(self.images_dir, "v", digest)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._pool, render_variants, data, out_dir, f"/images/v/{digest}", self.widths,
+        )
+        variants = result["variants"]
+        entry = {
+            "hash": digest, **result,
+            "card": _pick(variants, CARD_WIDTH), "full": _pick(variants, FULL_WIDTH),
+        }
+        self.by_hash[digest] = entry
+        self.stats["rendered"] += 1
+        self.stats["orig_bytes"] += len(data)
+        self.stats["card_bytes"] += os.path.getsize(os.path.join(self.images_dir, entry["card"][len("/images/"):]))
+        return entry
+
+    def summary(self):
+        s = self.stats
+        shrink = f", card images {s['card_bytes'] / max(s['orig_bytes'], 1):.0%} of original size" if s["rendered"] else ""
+        return (f"Images: {s['downloaded']} downloaded, {s['rendered']} rendered, "
+                f"{s['deduped']} deduped, {s['failed']} failed{shrink}")
+
+
+IMAGES = ImagePipeline()
+
+
+async def backfill(images_dir=IMAGES_DIR):
+    """Add every <address>.jpg already in `images_dir` to the manifest."""
+    pipeline = ImagePipeline(images_dir)
+    pipeline.start()
+    for name in sorted(os.listdir(images_dir)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")) and name not in pipeline.manifest:
+            with open(os.path.join(images_dir, name), "rb") as f:
+                pipeline.queue.put_nowait((name, f.read()))
+    await pipeline.close()
+    print(pipeline.summary())
+    print(f"✅ Manifest: {pipeline.manifest_path} ({len(pipeline.manifest)} images)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Listing image variants + manifest")
+    p.add_argument("--backfill", action="store_true", help="process images already in public/images")
+    p.add_argument("--images-dir", default=IMAGES_DIR)
+    args = p.parse_args()
+    if args.backfill:
+        asyncio.run(backfill(args.images_dir))
+    else:
+        p.print_help()
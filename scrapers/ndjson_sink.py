@@ -0,0 +1,153 @@
+"""
+ndjson_sink.py
+––––––––––––––
+Streaming output for the scrapers.
+
+NdjsonSink appends each record as one JSON line the moment it is scraped,
+flushing every `flush_every` records and fsyncing at most every
+`fsync_interval` seconds (and on close), so a crash loses at most the last
+few records and memory stays flat however large the crawl is.
+
+convert() derives the CSV / pretty JSON / Parquet exports from the NDJSON
+file afterwards, again streaming line by line:
+
+    python ndjson_sink.py listings.ndjson --csv listings.csv --json listings.json
+    python ndjson_sink.py listings.ndjson --parquet listings.parquet   # needs pyarrow
+"""
+
+import csv
+import json
+import os
+import time
+
+FLUSH_EVERY = 20
+FSYNC_INTERVAL = 5.0
+PARQUET_BATCH = 10_000
+
+
+class NdjsonSink:
+    def __init__(self, path, mode="w", flush_every=FLUSH_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._pending = 0
+        self._synced_at = time.monotonic()
+        self._f = open(path, mode, encoding="utf-8")
+
+    def write(self, record):
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self, fsync=False):
+        self._f.flush()
+        self._pending = 0
+        now = time.monotonic()
+        if fsync or now - self._synced_at >= self.fsync_interval:
+            os.fsync(self._f.fileno())
+            self._synced_at = now
+
+    def close(self):
+        if not self._f.closed:
+            self.flush(fsync=True)
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------- conversion -------------------------------------------------------
+def iter_records(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _columns(path):
+    # first pass: union of keys in first-seen order
+    cols = {}
+    for rec in iter_records(path):
+        cols.update(dict.fromkeys(rec))
+    return list(cols)
+
+
+def to_csv(path, out_csv):
+    cols = _columns(path)
+    n = 0
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=cols)
+        writer.writeheader()
+        for rec in iter_records(path):
+            writer.writerow(rec)
+            n += 1
+    return n
+
+
+def to_json(path, out_json):
+    """Same layout as json.dump(rows, f, indent=2), written one record at a time."""
+    n = 0
+    with open(out_json, "w", encoding="utf-8") as f:
+        f.write("[")
+        for rec in iter_records(path):
+            body = json.dumps(rec, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            f.write(("," if n else "") + "\n  " + body)
+            n += 1
+        f.write("\n]" if n else "]")
+    return n
+
+
+def to_parquet(path, out_parquet, batch_size=PARQUET_BATCH):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+    cols = _columns(path)
+    schema = pa.schema([(c, pa.string()) for c in cols])
+    n = 0
+    with pq.ParquetWriter(out_parquet, schema) as writer:
+        batch = []
+        for rec in iter_records(path):
+            batch.append({c: None if rec.get(c) is None else str(rec[c]) for c in cols})
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                n += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            n += len(batch)
+    return n
+
+
+def convert(path, csv_path=None, json_path=None, parquet_path=None):
+    """Write whichever exports are requested; returns {path: rows written}."""
+    written = {}
+    if csv_path:
+        written[csv_path] = to_csv(path, csv_path)
+    if json_path:
+        written[json_path] = to_json(path, json_path)
+    if parquet_path:
+        written[parquet_path] = to_parquet(path, parquet_path)
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Convert scraper NDJSON output")
+    p.add_argument("ndjson")
+    p.add_argument("--csv")
+    p.add_argument("--json")
+    p.add_argument("--parquet")
+    args = p.parse_args()
+
+    for out, n in convert(args.ndjson, args.csv, args.json, args.parquet).items():
+        print(f"✅ {n} records → {out}")
@@ -0,0 +1,86 @@
+"""
+resource_blocking.py
+––––––––––––––––––––
+Request interception + traffic metrics for the Playwright scrapers.
+
+Listing and detail pages only need the HTML document, the scripts that
+render it and the XHR/fetch calls those scripts make. Everything else
+(images, fonts, stylesheets, media, ad / analytics hosts) is aborted before
+it hits the network.
+
+Every instrumented page gets a TrafficMeter that counts requests, blocked
+requests and bytes transferred (headers + body) since its last reset().
+
+    SCRAPE_BLOCK_RESOURCES=0          # turn blocking off, keep the metrics
+    SCRAPE_BLOCKED_TYPES=image,font   # override the blocked resource types
+"""
+
+import os
+from urllib.parse import urlparse
+
+BLOCK_RESOURCES = os.getenv("SCRAPE_BLOCK_RESOURCES", "1") != "0"
+BLOCKED_TYPES = frozenset(
+    t.strip() for t in os.getenv(
+        "SCRAPE_BLOCKED_TYPES", "image,font,stylesheet,media,texttrack,manifest,beacon"
+    ).split(",") if t.strip()
+)
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com",
+    "doubleclick.net", "googleadservices.com", "adservice.google.com",
+    "facebook.net", "facebook.com", "connect.facebook.net",
+    "hotjar.com", "segment.io", "segment.com", "mixpanel.com", "amplitude.com",
+    "fullstory.com", "newrelic.com", "nr-data.net", "sentry.io",
+    "bing.com", "bat.bing.com", "criteo.com", "criteo.net", "taboola.com",
+    "outbrain.com", "adsrvr.org", "quantserve.com", "scorecardresearch.com",
+    "tiktok.com", "analytics.tiktok.com", "pinterest.com", "snapchat.com",
+    "linkedin.com", "ads.linkedin.com", "hubspot.com", "intercom.io",
+)
+
+
+def is_blocked_host(url):
+    host = urlparse(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in BLOCKED_HOSTS)
+
+
+class TrafficMeter:
+    """Per-page request / byte counters, reset between page loads."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+
+    def snapshot(self):
+        return {"requests": self.requests, "blocked": self.blocked, "bytes": self.bytes}
+
+    def summary(self):
+        return f"{self.requests} requests, {self.blocked} blocked, {self.bytes / 1024:.0f} KB"
+
+    async def _on_finished(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.bytes += (sizes["requestHeadersSize"] + sizes["requestBodySize"]
+                           + sizes["responseHeadersSize"] + sizes["responseBodySize"])
+        except Exception:
+            pass
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_TYPES or is_blocked_host(request.url):
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+async def instrument_page(page, block=BLOCK_RESOURCES):
+    """Attach a TrafficMeter to `page` and, if `block`, the interception route."""
+    meter = TrafficMeter()
+    page.on("requestfinished", meter._on_finished)
+    if block:
+        await page.route("**/*", meter._route)
+    return meter
@@ -0,0 +1,348 @@
+"""
+scrape_engine.py
+––––––––––––––––
+Shared concurrent detail-page engine for scraper.py and scraper_rental.py.
+
+A pool of N Playwright pages pulls URLs from an asyncio.Queue:
+  • a global semaphore caps in-flight scrapes across every pool using the
+    same engine,
+  • a per-host limiter spaces requests to the same host,
+  • failed / timed-out / empty scrapes are retried with exponential backoff,
+  • non-essential resources are blocked and bytes per listing are recorded
+    (resource_blocking.py).
+
+crawl_categories() is the whole crawl both scrapers share: each (city,
+property type) category runs in its own browser context, at most
+SCRAPE_CATEGORY_CONCURRENCY at a time, all sharing the engine's detail-page
+budget. URL frontiers and records go through the crawl state, rows stream
+into an NDJSON sink (converted to CSV/JSON at the end), images into the
+image pipeline, and CategoryProgress tracks each category. The scrapers
+only supply their category targets and a listing-page URL collector.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+from crawl_state import CrawlState
+from extraction import extract_detail
+from http_fastpath import FASTPATH
+from image_pipeline import IMAGES
+from ndjson_sink import NdjsonSink, convert
+from resource_blocking import BLOCK_RESOURCES, instrument_page
+from waits import WAITS, wait_for_detail
+from zip_index import get_zip_index, zipcode_for_address
+
+CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 4))
+CATEGORY_CONCURRENCY = int(os.getenv("SCRAPE_CATEGORY_CONCURRENCY", 3))
+HOST_MIN_INTERVAL = float(os.getenv("SCRAPE_HOST_INTERVAL", 0.5))   # seconds between hits per host
+DETAIL_TIMEOUT = 25
+RETRIES = 2
+BACKOFF_BASE = 2.0
+
+
+async def scrape_listing(page, url, property_type):
+    """One detail page → output row (HTTP fast path first, render as fallback)."""
+    try:
+        data = await FASTPATH.fetch(url)
+
+        if data is None:
+            print(f"    Loading page...")
+            await page.goto(url, timeout=15000)
+            await wait_for_detail(page)
+
+            print(f"    Extracting data...")
+            data = await extract_detail(page)
+
+        out = {
+            "address": data["address"],
+            "price": data["price"],
+            "property_type": property_type,
+            # ZIP from the address, else from the city/state index
+            "zipcode": zipcode_for_address(data["address"]),
+        }
+        # Images are downloaded and resized by the image pipeline, off the scrape path
+        IMAGES.submit(out["address"], data["image_url"])
+
+        for key in ("beds", "baths", "sqft", "garage", "description"):
+            out[key] = data[key]
+        return out
+
+    except Exception as e:
+        print(f"    Error: {e}")
+        return None
+
+
+class HostRateLimiter:
+    """Allow at most one request start per `min_interval` seconds per host."""
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._next = {}
+        self._locks = {}
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class CategoryProgress:
+    """Per-category counters: target, URLs listed, fresh-skipped, scraped, failed."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, category, target):
+        self.rows[category] = {"target": target, "urls": 0, "fresh": 0, "ok": 0, "failed": 0,
+                               "status": "queued", "started": None, "seconds": None}
+
+    def update(self, category, **fields):
+        if category in self.rows:
+            self.rows[category].update(fields)
+
+    def record(self, category, ok):
+        row = self.rows.get(category)
+        if row is not None:
+            row["ok" if ok else "failed"] += 1
+
+    def start(self, category):
+        self.update(category, status="running", started=time.perf_counter())
+        print(f"\n  ▶ {category}: started ({self.line(category)})")
+
+    def finish(self, category, status="done"):
+        row = self.rows[category]
+        row.update(status=status, seconds=time.perf_counter() - row["started"])
+        print(f"  ■ {category}: {status} in {row['seconds']:.1f}s ({self.line(category)})")
+
+    def line(self, category):
+        r = self.rows[category]
+        return f"{r['fresh'] + r['ok']}/{r['target']} rows, {r['failed']} failed"
+
+    def report(self):
+        lines = ["📊 Categories:"]
+        for category, r in self.rows.items():
+            took = f"{r['seconds']:.1f}s" if r["seconds"] is not None else "-"
+            lines.append(f"   - {category:<28} {r['status']:<7} {r['fresh'] + r['ok']:>3}/{r['target']:<3} "
+                         f"(fresh {r['fresh']}, scraped {r['ok']}, failed {r['failed']}, {r['urls']} URLs) {took}")
+        return "\n".join(lines)
+
+
+class ScrapeEngine:
+    def __init__(self, concurrency=CONCURRENCY, host_interval=HOST_MIN_INTERVAL,
+                 timeout=DETAIL_TIMEOUT, retries=RETRIES, page_timeout=60000,
+                 block_resources=BLOCK_RESOURCES):
+        self.concurrency = concurrency
+        self.block_resources = block_resources
+        self.timeout = timeout
+        self.retries = retries
+        self.page_timeout = page_timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = HostRateLimiter(host_interval)
+        self.progress = CategoryProgress()
+
+    async def _attempt(self, page, url, scrape_fn):
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.semaphore:
+                    await self.limiter.wait(url)
+                    result = await asyncio.wait_for(scrape_fn(page, url), timeout=self.timeout)
+                if result:
+                    return result
+                reason = "no data"
+            except asyncio.TimeoutError:
+                reason = f"timeout after {self.timeout}s"
+            except Exception as e:
+                reason = str(e)
+
+            if attempt < self.retries:
+                delay = BACKOFF_BASE ** attempt + random.uniform(0, 0.5)
+                print(f"      ↻ Retry {attempt + 1}/{self.retries} in {delay:.1f}s ({reason}): {url}")
+                await asyncio.sleep(delay)
+            else:
+                print(f"      ✗ Giving up after {self.retries + 1} attempts ({reason}): {url}")
+        return None
+
+    async def scrape_all(self, context, urls, scrape_fn, label="listing", n_pages=None, on_result=None):
+        """
+        Scrape `urls` with `scrape_fn(page, url)` on a pool of pages opened
+        from `context` (a Browser or BrowserContext). Returns successful
+        results in the order of `urls`.
+
+        With `on_result(url, result)` each result is handed to the callback
+        as it finishes (None on failure) and not kept; only the number of
+        successful results is returned, so memory stays flat.
+        """
+        if not urls:
+            return 0 if on_result is not None else []
+        n_pages = min(n_pages or self.concurrency, len(urls))
+        queue = asyncio.Queue()
+        for i, url in enumerate(urls):
+            queue.put_nowait((i, url))
+
+        results = [None] * len(urls) if on_result is None else None
+        done = 0
+        n_ok = 0
+        total_bytes = 0
+
+        async def worker():
+            nonlocal done, n_ok, total_bytes
+            page = await context.new_page()
+            page.set_default_timeout(self.page_timeout)
+            meter = await instrument_page(page, block=self.block_resources)
+            try:
+                while True:
+                    try:
+                        i, url = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    meter.reset()
+                    result = await self._attempt(page, url, scrape_fn)
+                    self.progress.record(label, bool(result))
+                    if on_result is not None:
+                        on_result(url, result)
+                    else:
+                        results[i] = result
+                    done += 1
+                    n_ok += bool(result)
+                    total_bytes += meter.bytes
+                    if result:
+                        print(f"    [{done}/{len(urls)}] ✓ {label}: {result.get('address', 'Unknown')} - {result.get('price', 'No price')} ({meter.summary()})")
+                    else:
+                        print(f"    [{done}/{len(urls)}] ✗ {label}: {url} ({meter.summary()})")
+            finally:
+                await page.close()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(n_pages)))
+        elapsed = time.perf_counter() - t0
+        print(f"    ⏱  {label}: {n_ok}/{len(urls)} listings in {elapsed:.1f}s on {n_pages} pages "
+              f"({len(urls) / max(elapsed, 1e-9):.2f}/s, {total_bytes / 1024:.0f} KB, "
+              f"{total_bytes / 1024 / len(urls):.0f} KB/listing)")
+        if on_result is not None:
+            return n_ok
+        return [r for r in results if r]
+
+    async def crawl_categories(self, browser, scraper, categories, list_urls, out_ndjson, out_csv, out_json,
+                               concurrency=CATEGORY_CONCURRENCY):
+        """
+        Crawl every category of `scraper` ("sale" / "rental") and write the
+        outputs. `categories` maps "<city>/<property type>" → target row
+        count; `list_urls(page, category, target)` collects detail URLs from
+        the category's listing page. Returns rows written per category.
+        """
+        get_zip_index()  # build the ZIP index once, before any listing needs it
+        state = CrawlState(scraper)
+        sink = NdjsonSink(out_ndjson)
+        rows = Counter()
+        IMAGES.start()
+
+        def emit(category, record):
+            sink.write(record)
+            rows[category] += 1
+
+        async def crawl_category(context, category):
+            property_type = category.split("/")[1]
+            target = categories[category]
+
+            # Reuse a recent frontier, else read the listing page
+            urls = state.frontier(category, target)
+            if len(urls) < target:
+                page = await context.new_page()
+                page.set_default_timeout(self.page_timeout)
+                list_meter = await instrument_page(page)
+                urls = await list_urls(page, category, target)
+                print(f"  📦 {category} listing page: {list_meter.summary()}")
+                await page.close()
+                state.add_urls(category, urls)
+            else:
+                print(f"  ↺ {category}: reusing {len(urls)} URLs from the crawl state")
+            self.progress.update(category, urls=len(urls))
+
+            if not urls:
+                print(f"  ⚠️  No URLs found for {category}")
+                return
+
+            # Only new, failed or stale listings are fetched again
+            todo = state.due(urls)
+            if len(todo) < len(urls):
+                pending = set(todo)
+                n_fresh = 0
+                for record in state.records([url for url in urls if url not in pending]):
+                    emit(category, record)
+                    n_fresh += 1
+                self.progress.update(category, fresh=n_fresh)
+                print(f"  ↺ {category}: {n_fresh} listings are fresh, skipping")
+
+            def on_result(url, record):
+                state.record(url, record)
+                if record:
+                    emit(category, record)
+
+            await self.scrape_all(
+                context, todo,
+                lambda page, url: scrape_listing(page, url, property_type),
+                label=category,
+                on_result=on_result,
+            )
+
+        try:
+            await self._run_categories(browser, categories, crawl_category, concurrency)
+            print(f"\n{self.progress.report()}")
+        finally:
+            sink.close()
+
+            # Derive CSV and JSON from the streamed NDJSON
+            if sink.count:
+                convert(out_ndjson, csv_path=out_csv, json_path=out_json)
+                print(f"\n✅ Saved {sink.count} rows to {out_ndjson}, {out_csv} and {out_json}")
+            else:
+                print("❌ No data was scraped successfully")
+
+            print(f"\n{WAITS.report()}")
+            print(FASTPATH.summary())
+            print(state.summary())
+            state.close()
+            await FASTPATH.close()
+            print("Waiting for image pipeline...")
+            await IMAGES.close()
+            print(IMAGES.summary())
+        return rows
+
+    async def _run_categories(self, browser, categories, crawl_fn, concurrency=CATEGORY_CONCURRENCY):
+        """
+        Run `crawl_fn(context, category)` for every category (a mapping of
+        category → target row count), each in its own browser context and at
+        most `concurrency` at a time. Detail pages of all categories share
+        this engine's semaphore and host limiter.
+        """
+        for category, target in categories.items():
+            self.progress.add(category, target)
+        gate = asyncio.Semaphore(concurrency)
+
+        async def run(category):
+            async with gate:
+                self.progress.start(category)
+                context = await browser.new_context()
+                status = "done"
+                try:
+                    await crawl_fn(context, category)
+                except Exception as e:
+                    status = "failed"
+                    print(f"  ✗ {category}: {e}")
+                finally:
+                    await context.close()
+                self.progress.finish(category, status)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(run(c) for c in categories))
+        print(f"\n⏱  {len(categories)} categories in {time.perf_counter() - t0:.1f}s "
+              f"({concurrency} contexts, {self.concurrency} detail pages)")
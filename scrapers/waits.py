@@ -0,0 +1,107 @@
+"""
+waits.py
+––––––––
+Event-driven waits for the Playwright scrapers.
+
+Instead of fixed sleeps, each wait returns as soon as its readiness signal
+fires (the nodes extract_detail reads have rendered, the network goes idle,
+the result count grows while scrolling) and gives up at a configurable
+ceiling, which defaults to the fixed delay it replaced. Every wait is
+recorded in WAITS, a per-kind histogram of the time actually spent.
+
+    SCRAPE_LIST_WAIT_MS     ceiling for listing-page readiness   (3000)
+    SCRAPE_DETAIL_WAIT_MS   ceiling for detail-page readiness    (2000)
+    SCRAPE_SCROLL_WAIT_MS   ceiling for new results per scroll   (800)
+"""
+
+import bisect
+import os
+import time
+
+from extraction import DETAIL_CONFIG
+
+LIST_WAIT_MS = int(os.getenv("SCRAPE_LIST_WAIT_MS", 3000))
+DETAIL_WAIT_MS = int(os.getenv("SCRAPE_DETAIL_WAIT_MS", 2000))
+SCROLL_WAIT_MS = int(os.getenv("SCRAPE_SCROLL_WAIT_MS", 800))
+POLL_MS = 100
+
+# price, description and a gallery image rendered (same selectors as EXTRACT_JS)
+DETAIL_READY_JS = """
+(cfg) => {
+  const text = (sel) => {
+    try { const el = document.querySelector(sel); return el ? (el.innerText || "").trim() : ""; }
+    catch (e) { return ""; }
+  };
+  const hasImage = (sel) => {
+    try { return Array.from(document.querySelectorAll(sel)).some((img) => (img.getAttribute("src") || "").startsWith("http")); }
+    catch (e) { return false; }
+  };
+  const long = (sel) => text(sel).length > cfg.min_description_len;
+  return cfg.fields.price.some(text)
+    && (long(cfg.description_section) || cfg.description.some(long))
+    && cfg.images.some(hasImage);
+}
+"""
+RESULT_SELECTOR = "a[href*='real-estate/']"
+
+BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+class WaitHistogram:
+    """Counts of wait durations per kind, bucketed by BUCKETS_MS."""
+
+    def __init__(self):
+        self.counts = {}
+        self.totals = {}
+        self.timeouts = {}
+
+    def record(self, kind, ms, timed_out=False):
+        counts = self.counts.setdefault(kind, [0] * (len(BUCKETS_MS) + 1))
+        counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.totals[kind] = self.totals.get(kind, 0.0) + ms
+        self.timeouts[kind] = self.timeouts.get(kind, 0) + int(timed_out)
+
+    def report(self):
+        labels = [f"≤{b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        lines = ["⏳ Wait times (ms):"]
+        for kind, counts in self.counts.items():
+            n = sum(counts)
+            hist = "  ".join(f"{label}:{c}" for label, c in zip(labels, counts) if c)
+            lines.append(f"   - {kind}: n={n} mean={self.totals[kind] / n:.0f} "
+                         f"ceiling-hit={self.timeouts[kind]}  {hist}")
+        return "\n".join(lines)
+
+
+WAITS = WaitHistogram()
+
+
+async def _timed(kind, awaitable):
+    t0 = time.perf_counter()
+    timed_out = False
+    try:
+        await awaitable
+    except Exception:
+        # Playwright raises TimeoutError at the ceiling; carry on with what rendered
+        timed_out = True
+    WAITS.record(kind, (time.perf_counter() - t0) * 1000, timed_out)
+    return not timed_out
+
+
+async def wait_for_listing(page, ceiling_ms=LIST_WAIT_MS):
+    """Wait for the listing page's XHR burst to settle."""
+    return await _timed("listing", page.wait_for_load_state("networkidle", timeout=ceiling_ms))
+
+
+async def wait_for_detail(page, config=DETAIL_CONFIG, ceiling_ms=DETAIL_WAIT_MS):
+    """Wait until the detail page has rendered the price, description and gallery."""
+    return await _timed("detail", page.wait_for_function(
+        DETAIL_READY_JS, arg=config, polling=POLL_MS, timeout=ceiling_ms,
+    ))
+
+
+async def wait_for_more_results(page, count, height, selector=RESULT_SELECTOR, ceiling_ms=SCROLL_WAIT_MS):
+    """After a scroll, wait until more results (or a taller page) appear."""
+    return await _timed("scroll", page.wait_for_function(
+        "([sel, n, h]) => document.querySelectorAll(sel).length > n || document.body.scrollHeight > h",
+        arg=[selector, count, height], timeout=ceiling_ms,
+    ))
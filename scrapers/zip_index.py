@@ -0,0 +1,88 @@
+"""
+zip_index.py
+––––––––––––
+Offline ZIP lookup for scraped addresses.
+
+The bundled `zipcodes` data is read once into two in-memory indexes:
+known ZIP → state, and (CITY, STATE) → ZIPs (active ones first). A listing
+gets the ZIP written in its address when there is one; otherwise the
+city/state is resolved the same way scrape_detail always did and looked up
+in the index. No thread pools, no linear `filter_by` scans.
+"""
+
+import re
+
+import zipcodes
+
+# "..., Tampa, FL 33602" / "... FL 33602-1234" / trailing "33602"
+_ZIP_AFTER_STATE = re.compile(r"\b([A-Z]{2})\s+(\d{5})(?:-\d{4})?\b")
+_TRAILING_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\s*$")
+
+# keyword → (city, state) for the cities we crawl
+KNOWN_CITIES = {
+    "tampa": ("Tampa", "FL"),
+    "san francisco": ("San Francisco", "CA"),
+    "new york": ("New York", "NY"),
+}
+DEFAULT_CITY = ("Tampa", "FL")
+
+
+class ZipIndex:
+    def __init__(self, records):
+        self.zip_state = {}
+        by_city = {}
+        for r in records:
+            self.zip_state[r["zip_code"]] = r["state"]
+            by_city.setdefault((r["city"].upper(), r["state"]), []).append((not r.get("active", True), r["zip_code"]))
+        # stable sort keeps the data's ZIP order within active / inactive
+        self.city_zips = {key: [z for _, z in sorted(zs, key=lambda t: t[0])] for key, zs in by_city.items()}
+
+    def from_address(self, address):
+        """ZIP written in the address, if it is a real one (and in the right state)."""
+        after_state = _ZIP_AFTER_STATE.findall(address)
+        for state, zip_code in after_state:
+            if self.zip_state.get(zip_code) == state:
+                return zip_code
+        if after_state:
+            return ""
+        m = _TRAILING_ZIP.search(address)
+        if m and m.group(1) in self.zip_state:
+            return m.group(1)
+        return ""
+
+    def from_city(self, city, state):
+        zips = self.city_zips.get((city.upper(), state.upper()))
+        return zips[0] if zips else ""
+
+
+def city_state_from_address(address):
+    """Resolve (city, state) from a listing address, defaulting to Tampa, FL."""
+    address_text = address.lower()
+    for keyword, city_state in KNOWN_CITIES.items():
+        if keyword in address_text:
+            return city_state
+
+    # Fallback: try to extract from comma-separated format
+    parts = address.split(',')
+    if len(parts) >= 2:
+        last_part = parts[-1].strip()
+        if len(last_part) == 2 and last_part.isupper():
+            city = parts[-2].strip() if len(parts) > 2 else parts[0].strip()
+            return city, last_part
+    return DEFAULT_CITY
+
+
+_index = None
+
+
+def get_zip_index():
+    """Build the index on first use (call at startup to pay for it up front)."""
+    global _index
+    if _index is None:
+        _index = ZipIndex(zipcodes.list_all())
+    return _index
+
+
+def zipcode_for_address(address):
+    index = get_zip_index()
+    return index.from_address(address) or index.from_city(*city_state_from_address(address))
@@ -37,7 +37,7 @@ export function PropertyCard({
   sqft,
   price,
   description,
-  image,
+  thumbnail,
   property_type,
   sale_type,
 }: Property) {
@@ -70,7 +70,7 @@ export function PropertyCard({
               className="w-full h-full"
             >
               <Image
-                src={image}
+                src={thumbnail}
                 alt={`Image of ${address}`}
                 fill
                 sizes="(max-width: 768px) 100vw, 50vw"
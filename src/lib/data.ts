@@ -9,9 +9,24 @@ export function getImageFilename(address: string): string {
     + ".jpg";
 }
 
+// Resized variants written by scrapers/image_pipeline.py, keyed by image filename
+interface ImageManifestEntry {
+  card: string;
+  full: string;
+}
+
+async function getImageManifest(): Promise<Record<string, ImageManifestEntry>> {
+  try {
+    const response = await fetch('/images/manifest.json');
+    return response.ok ? await response.json() : {};
+  } catch {
+    return {};
+  }
+}
+
 export async function getProperties(): Promise<Property[]> {
   try {
-    const response = await fetch('/data.json');
+    const [response, manifest] = await Promise.all([fetch('/data.json'), getImageManifest()]);
     if (!response.ok) {
       throw new Error('Failed to fetch properties');
     }
@@ -21,22 +36,27 @@ export async function getProperties(): Promise<Property[]> {
     console.log('First property sample:', properties[0]);
     
     // Transform the data to match our Property interface
-    const transformedProperties = properties.map((property: any, index: number) => ({
-      id: index.toString(),
-      address: property.address,
-      price: property.price,
-      zipcode: property.zipcode,
-      beds: property.beds,
-      baths: property.baths,
-      sqft: property.sqft,
-      garage: property.garage,
-      description: property.description,
-      property_type: property.property_type || 'house', // Default to 'house' if not specified
-      image: `/images/${getImageFilename(property.address)}`,
-      index: property.index || index, // Use the index from data or fallback to array index
-      sale_type: property.sale_type || 'Sale', // Default to 'Sale' if not specified
-      score: property.score || '5' // Default to '5' if not specified
-    }));
+    const transformedProperties = properties.map((property: any, index: number) => {
+      const filename = getImageFilename(property.address);
+      const variants = manifest[filename];
+      return {
+        id: index.toString(),
+        address: property.address,
+        price: property.price,
+        zipcode: property.zipcode,
+        beds: property.beds,
+        baths: property.baths,
+        sqft: property.sqft,
+        garage: property.garage,
+        description: property.description,
+        property_type: property.property_type || 'house', // Default to 'house' if not specified
+        image: variants?.full ?? `/images/${filename}`,
+        thumbnail: variants?.card ?? `/images/${filename}`,
+        index: property.index || index, // Use the index from data or fallback to array index
+        sale_type: property.sale_type || 'Sale', // Default to 'Sale' if not specified
+        score: property.score || '5' // Default to '5' if not specified
+      };
+    });
     
     console.log('Transformed properties:', transformedProperties.length);
     console.log('First transformed property:', transformedProperties[0]);
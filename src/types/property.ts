@@ -9,6 +9,7 @@ export interface Property {
   garage: string;
   description: string;
   image: string;
+  thumbnail: string;
   property_type: string;
   index: number;
   sale_type: string;